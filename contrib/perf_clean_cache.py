@@ -0,0 +1,43 @@
+from timeit import timeit
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.types import registry
+
+ENTITY = {
+    "id": "test",
+    "schema": "Person",
+    "properties": {
+        "name": "Ralph Tester",
+        "birthDate": "1972-05-01",
+        "nationality": ["Germany", "United States"],
+        "idNumber": ["9177171", "8e839023"],
+        "website": "https://ralphtester.me",
+        "phone": "+1 (202) 555-7612",
+        "email": "info@ralphtester.me",
+        "topics": "role.spy",
+    },
+}
+CACHED = (registry.country, registry.date, registry.phone)
+
+
+def create_proxy():
+    proxy = EntityProxy.from_dict(model, ENTITY, cleaned=False)
+    return proxy.to_dict()
+
+
+def benchmark():
+    for i in range(50000):
+        create_proxy()
+
+
+if __name__ == "__main__":
+    sizes = {t: t.cache_size for t in CACHED}
+    for t in CACHED:
+        t.set_cache_size(0)
+    print("uncached: %.2fs" % timeit(benchmark, number=1))
+    for t in CACHED:
+        t.set_cache_size(sizes[t])
+    print("cached: %.2fs" % timeit(benchmark, number=1))
+    for t in CACHED:
+        print(t, t.cache_info())
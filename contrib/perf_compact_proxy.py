@@ -0,0 +1,59 @@
+import tracemalloc
+from timeit import timeit
+
+from followthemoney import model
+
+ENTITY = {
+    "id": "test",
+    "schema": "Person",
+    "properties": {
+        "name": ["Ralph Tester"],
+        "birthDate": ["1972-05-01"],
+        "idNumber": ["9177171", "8e839023"],
+        "website": ["https://ralphtester.me"],
+        "phone": ["+12025557612"],
+        "email": ["info@ralphtester.me"],
+        "topics": ["role.spy"],
+    },
+}
+FRAGMENT = {
+    "id": "test",
+    "schema": "LegalEntity",
+    "properties": {
+        "name": ["Ralph T. Tester"],
+        "country": ["us"],
+        "email": ["ralph@example.com"],
+    },
+}
+COUNT = 100_000
+
+
+def create_proxies(compact: bool):
+    return [model.get_proxy(ENTITY, compact=compact) for _ in range(COUNT)]
+
+
+def merge_proxies(compact: bool):
+    # Like aggregating fragments: each entity is merged with another fragment.
+    proxies = create_proxies(compact)
+    for proxy in proxies:
+        proxy.merge(model.get_proxy(FRAGMENT, compact=compact))
+    return proxies
+
+
+def measure(func, compact: bool):
+    tracemalloc.start()
+    proxies = func(compact)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del proxies
+    seconds = timeit(lambda: func(compact), number=1)
+    label = "compact" if compact else "regular"
+    print(
+        f"{func.__name__} {label}: {current / COUNT:.0f} bytes/entity, {seconds:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    for func in (create_proxies, merge_proxies):
+        measure(func, False)
+        measure(func, True)
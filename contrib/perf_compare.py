@@ -1,3 +1,5 @@
+from timeit import timeit
+
 from followthemoney import model
 from followthemoney.proxy import EntityProxy
 from followthemoney import compare
@@ -15,19 +17,32 @@ ENTITY = {
         "topics": "role.spy",
     },
 }
+CANDIDATES = 10_000
 
 
 def create_proxy():
-    proxy = EntityProxy.from_dict(model, ENTITY)
-    data = proxy.to_dict()
-    return data
+    return EntityProxy.from_dict(model, ENTITY)
 
 
 def benchmark():
     proxy = create_proxy()
-    for i in range(10_000):
+    for i in range(CANDIDATES):
         compare.compare(model, proxy, proxy)
 
 
+def benchmark_many():
+    proxy = create_proxy()
+    candidates = [create_proxy() for _ in range(CANDIDATES)]
+    compare.compare_many(model, proxy, candidates)
+
+
+def benchmark_features():
+    proxy = create_proxy()
+    features = compare.ComparisonFeatures(create_proxy())
+    compare.compare_many(model, proxy, [features] * CANDIDATES)
+
+
 if __name__ == "__main__":
-    benchmark()
+    print("compare: %.2fs" % timeit(benchmark, number=1))
+    print("compare_many: %.2fs" % timeit(benchmark_many, number=1))
+    print("compare_many (features): %.2fs" % timeit(benchmark_features, number=1))
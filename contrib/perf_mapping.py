@@ -0,0 +1,75 @@
+import os
+import yaml
+from itertools import cycle, islice
+from timeit import timeit
+from typing import Any, Dict
+
+from followthemoney import model
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures")
+ROWS = 20000
+RUNS = 3
+
+EXPERTS: Dict[str, Any] = {
+    "csv_url": "file://" + os.path.abspath(os.path.join(FIXTURES, "experts.csv")),
+    "entities": {
+        "expert": {
+            "schema": "Person",
+            "keys": ["id", "name"],
+            "properties": {
+                "name": {"column": "name"},
+                "nationality": {"column": "nationality"},
+                "gender": {"column": "gender"},
+                "title": {"column": "professional_title"},
+                "sourceUrl": {"column": "uri"},
+                "description": {
+                    "template": "{{member_type}}: {{professional_profile}}"
+                },
+            },
+        },
+        "group": {
+            "schema": "PublicBody",
+            "key": "group_code",
+            "properties": {
+                "name": {"column": "group_name"},
+                "sourceUrl": {"column": "group_uri"},
+                "jurisdiction": {"literal": "eu"},
+            },
+        },
+        "membership": {
+            "schema": "Membership",
+            "keys": ["id", "group_code"],
+            "properties": {
+                "member": {"entity": "expert"},
+                "organization": {"entity": "group"},
+                "role": {"column": "membership_status"},
+            },
+        },
+    },
+}
+
+
+def load_kek() -> Dict[str, Any]:
+    db_path = os.path.abspath(os.path.join(FIXTURES, "kek.sqlite"))
+    os.environ["FTM_TEST_DATABASE_URI"] = "sqlite:///" + db_path
+    with open(os.path.join(FIXTURES, "kek.yml"), "r") as fh:
+        data: Dict[str, Any] = yaml.safe_load(fh)
+    return data
+
+
+def benchmark(name: str, mapping: Dict[str, Any]) -> None:
+    query = model.make_mapping(mapping)
+    records = list(query.source.records)
+    records = list(islice(cycle(records), ROWS))
+
+    def run() -> None:
+        for record in records:
+            query.map(record)
+
+    elapsed = timeit(run, number=RUNS) / RUNS
+    print("%s: %d rows/s" % (name, ROWS / elapsed))
+
+
+if __name__ == "__main__":
+    benchmark("experts.csv", EXPERTS)
+    benchmark("kek.sqlite", load_kek())
@@ -0,0 +1,35 @@
+import os
+import sys
+import subprocess
+
+SCRIPT = """
+import resource
+from time import perf_counter
+import followthemoney
+from followthemoney.model import Model
+
+def rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+before = rss()
+start = perf_counter()
+model = Model(followthemoney.model_path, snapshot=followthemoney.snapshot_path, lazy=%r)
+for name in ("Person", "Company", "Ownership"):
+    model.make_entity(name)
+elapsed = (perf_counter() - start) * 1000
+print("%%.1fms, %%d schemata, RSS +%%.1fMB" %% (elapsed, len(model.schemata), rss() - before))
+"""
+
+
+def run(lazy: bool) -> None:
+    # Keep the default model singleton from being loaded on import:
+    env = dict(os.environ, FTM_MODEL_LAZY="true")
+    cmd = [sys.executable, "-c", SCRIPT % lazy]
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True, env=env)
+    print("lazy:" if lazy else "eager:", result.stdout.strip())
+
+
+if __name__ == "__main__":
+    for _ in range(3):
+        run(False)
+        run(True)
@@ -0,0 +1,28 @@
+import os
+import sys
+import subprocess
+from timeit import timeit
+
+import followthemoney
+from followthemoney.model import Model
+
+RUNS = 20
+
+
+def load_yaml():
+    Model(followthemoney.model_path)
+
+
+def load_snapshot():
+    Model(followthemoney.model_path, snapshot=followthemoney.snapshot_path)
+
+
+def import_time():
+    cmd = [sys.executable, "-c", "import followthemoney"]
+    subprocess.run(cmd, check=True, env=dict(os.environ))
+
+
+if __name__ == "__main__":
+    print("yaml: %.3fs" % (timeit(load_yaml, number=RUNS) / RUNS))
+    print("snapshot: %.3fs" % (timeit(load_snapshot, number=RUNS) / RUNS))
+    print("import followthemoney: %.3fs" % (timeit(import_time, number=5) / 5))
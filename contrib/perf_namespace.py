@@ -0,0 +1,43 @@
+from timeit import timeit
+from typing import List
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.namespace import Namespace
+
+NODES = 2000
+EDGES = 20000
+RUNS = 3
+
+
+def make_entities() -> List[EntityProxy]:
+    """Generate a graph in which many edges reference the same nodes."""
+    entities: List[EntityProxy] = []
+    for i in range(NODES):
+        company = model.make_entity("Company")
+        company.id = "company-%d" % i
+        company.add("name", "Company %d" % i)
+        company.add("jurisdiction", "gb")
+        company.add("registrationNumber", "%08d" % i)
+        entities.append(company)
+    for i in range(EDGES):
+        ownership = model.make_entity("Ownership")
+        ownership.id = "ownership-%d" % i
+        ownership.add("owner", "company-%d" % (i % NODES))
+        ownership.add("asset", "company-%d" % ((i * 7) % NODES))
+        ownership.add("percentage", "%d" % (i % 100))
+        entities.append(ownership)
+    return entities
+
+
+if __name__ == "__main__":
+    entities = make_entities()
+    namespace = Namespace("benchmark")
+
+    def apply() -> None:
+        for entity in entities:
+            namespace.apply(entity)
+
+    elapsed = timeit(apply, number=RUNS) / RUNS
+    rate = len(entities) / elapsed
+    print("apply: %.3fs (%d entities/s)" % (elapsed, rate))
@@ -0,0 +1,50 @@
+import os
+import resource
+from tempfile import mkdtemp
+from timeit import timeit
+from typing import List, Optional
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.export.graph import edge_types
+from followthemoney.export.neo4j import Neo4JCSVExporter
+from followthemoney.util import MEGABYTE
+
+ENTITIES = 20000
+
+
+def make_entities() -> List[EntityProxy]:
+    """Generate people whose phone numbers and addresses become value nodes."""
+    entities: List[EntityProxy] = []
+    for i in range(ENTITIES):
+        person = model.make_entity("Person")
+        person.id = "person-%d" % i
+        person.add("name", "Person %d" % i)
+        person.add("phone", "+1202555%04d" % (i % 10000))
+        person.add("email", "person-%d@example.com" % i)
+        person.add("address", "%d Main Street, Springfield" % (i % 20000))
+        entities.append(person)
+    return entities
+
+
+def export(entities: List[EntityProxy], memory_limit: Optional[int]) -> None:
+    outdir = mkdtemp()
+    exporter = Neo4JCSVExporter(
+        outdir, edge_types=edge_types(), memory_limit=memory_limit
+    )
+    for entity in entities:
+        exporter.write(entity)
+    exporter.finalize()
+    with open(os.path.join(outdir, "_nodes.csv"), "rb") as fh:
+        nodes = sum(1 for _ in fh) - 1
+    print("  %d value nodes written" % nodes)
+
+
+if __name__ == "__main__":
+    entities = make_entities()
+    for memory_limit in (None, 1 * MEGABYTE):
+        elapsed = timeit(lambda: export(entities, memory_limit), number=1)
+        rate = len(entities) / elapsed
+        print("memory_limit=%s: %.3fs (%d entities/s)" % (memory_limit, elapsed, rate))
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("max RSS: %d MB" % (maxrss // 1024))
@@ -0,0 +1,58 @@
+import shutil
+from tempfile import mkdtemp
+from timeit import timeit
+from typing import List
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.export.common import Exporter
+from followthemoney.export.csv import CSVExporter
+from followthemoney.export.parquet import ParquetExporter
+
+ENTITIES = 20000
+RUNS = 3
+
+
+def make_entities() -> List[EntityProxy]:
+    entities = []
+    for i in range(ENTITIES):
+        proxy = model.make_entity("Company")
+        proxy.id = "company-%s" % i
+        proxy.add("name", ["Company %s" % i, "Firm %s" % i])
+        proxy.add("jurisdiction", "gb")
+        proxy.add("registrationNumber", str(i))
+        proxy.add("incorporationDate", "2010-%02d-01" % (i % 12 + 1))
+        entities.append(proxy)
+    return entities
+
+
+ENTITY_LIST = make_entities()
+
+
+def export(exporter: Exporter) -> None:
+    for entity in ENTITY_LIST:
+        exporter.write(entity)
+    exporter.finalize()
+
+
+def export_csv() -> None:
+    directory = mkdtemp()
+    try:
+        export(CSVExporter(directory))
+    finally:
+        shutil.rmtree(directory)
+
+
+def export_parquet() -> None:
+    directory = mkdtemp()
+    try:
+        export(ParquetExporter(directory))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    for func in (export_csv, export_parquet):
+        elapsed = timeit(func, number=RUNS) / RUNS
+        rate = ENTITIES / elapsed
+        print("%s: %.3fs (%d entities/s)" % (func.__name__, elapsed, rate))
@@ -0,0 +1,54 @@
+import os
+import orjson
+import tempfile
+from io import BytesIO
+from timeit import timeit
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.cli.util import path_entities, write_entity
+
+ENTITIES = 100000
+RUNS = 3
+
+
+def make_stream() -> str:
+    fh = BytesIO()
+    for i in range(ENTITIES):
+        proxy = model.make_entity("Company")
+        proxy.id = "company-%s" % i
+        proxy.add("name", ["Company %s" % i, "Firm %s" % i])
+        proxy.add("jurisdiction", "gb")
+        proxy.add("registrationNumber", str(i))
+        write_entity(fh, proxy)
+    _, path = tempfile.mkstemp(suffix=".ijson")
+    with open(path, "wb") as out:
+        out.write(fh.getvalue())
+    return path
+
+
+PATH = make_stream()
+
+
+def read_baseline() -> None:
+    with open(PATH, "rb") as fh:
+        while line := fh.readline():
+            EntityProxy.from_dict(model, orjson.loads(line))
+
+
+def read_default() -> None:
+    for _ in path_entities(PATH, EntityProxy, trusted=False):
+        pass
+
+
+def read_trusted() -> None:
+    for _ in path_entities(PATH, EntityProxy, trusted=True):
+        pass
+
+
+if __name__ == "__main__":
+    for func in (read_baseline, read_default, read_trusted):
+        elapsed = timeit(func, number=RUNS) / RUNS
+        rate = ENTITIES / elapsed
+        print("%s: %.3fs (%d entities/s)" % (func.__name__, elapsed, rate))
+    os.unlink(PATH)
@@ -0,0 +1,57 @@
+import os
+import tempfile
+from timeit import timeit
+from typing import List
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.cli.util import FORMATS, path_entities, path_entity_writer
+
+ENTITIES = 100000
+RUNS = 3
+
+
+def make_entities() -> List[EntityProxy]:
+    entities = []
+    for i in range(ENTITIES):
+        proxy = model.make_entity("Company")
+        proxy.id = "company-%s" % i
+        proxy.add("name", ["Company %s" % i, "Firm %s" % i])
+        proxy.add("jurisdiction", "gb")
+        proxy.add("registrationNumber", str(i))
+        proxy.add("incorporationDate", "2010-01-%02d" % (i % 28 + 1))
+        entities.append(proxy)
+    return entities
+
+
+if __name__ == "__main__":
+    entities = make_entities()
+    directory = tempfile.mkdtemp()
+    for format in FORMATS:
+        path = os.path.join(directory, "entities.%s" % format)
+
+        def write() -> None:
+            with path_entity_writer(path, format=format) as writer:
+                for entity in entities:
+                    writer.write(entity)
+
+        def read() -> None:
+            for _ in path_entities(path, EntityProxy, trusted=True):
+                pass
+
+        write_time = timeit(write, number=RUNS) / RUNS
+        read_time = timeit(read, number=RUNS) / RUNS
+        size = os.path.getsize(path)
+        os.unlink(path)
+        print(
+            "%s: write %.3fs (%d/s), read %.3fs (%d/s), %d bytes"
+            % (
+                format,
+                write_time,
+                ENTITIES / write_time,
+                read_time,
+                ENTITIES / read_time,
+                size,
+            )
+        )
+    os.rmdir(directory)
@@ -1,4 +1,5 @@
 import os
+from banal import as_bool
 
 from followthemoney.model import Model
 from followthemoney.util import set_model_locale
@@ -9,8 +10,10 @@ __version__ = "3.8.4"
 model_path = os.path.dirname(__file__)
 model_path = os.path.join(model_path, "schema")
 model_path = os.environ.get("FTM_MODEL_PATH", model_path)
+snapshot_path = os.path.join(os.path.dirname(__file__), "model.json")
+model_lazy = as_bool(os.environ.get("FTM_MODEL_LAZY", False))
 
 # Data model singleton
-model = Model(model_path)
+model = Model(model_path, snapshot=snapshot_path, lazy=model_lazy)
 
 __all__ = ["model", "set_model_locale"]
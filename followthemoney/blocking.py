@@ -0,0 +1,124 @@
+"""
+Candidate generation for entity de-duplication.
+
+Comparing every entity in a dataset with every other entity using
+:func:`~followthemoney.compare.compare` is quadratic in the size of the
+dataset. A blocking index reduces the set of pairs to be compared to those
+that share at least one distinctive feature, such as a name token or an
+identifier. Blocks which contain too many entities (e.g. a very common name
+part like ``ltd``) are skipped, like stopwords in a search index.
+
+The resulting pairs can be fed straight into the comparison functions::
+
+    index = BlockingIndex()
+    for entity in entities:
+        index.add(entity)
+    for left, right in index.pairs():
+        score = compare(model, left, right)
+"""
+
+import logging
+from typing import Dict, Generator, Iterable, List, Set, Tuple
+from normality import normalize
+
+from followthemoney.exc import InvalidData
+from followthemoney.proxy import EntityProxy
+from followthemoney.types import registry
+from followthemoney.types.common import PropertyType
+
+log = logging.getLogger(__name__)
+Token = Tuple[str, str]
+
+#: Property types whose values are used as blocking keys in their entirety.
+BLOCKING_TYPES: Set[PropertyType] = {
+    registry.identifier,
+    registry.phone,
+    registry.email,
+    registry.iban,
+}
+
+
+class BlockingIndex(object):
+    """An inverted index from name tokens and identifying property values to
+    the entities which contain them. Used to generate candidate pairs for
+    entity comparison.
+
+    :param max_block: blocks with more entities than this are ignored when
+        generating pairs.
+    :param min_token: name tokens shorter than this are not indexed.
+    """
+
+    def __init__(self, max_block: int = 100, min_token: int = 2) -> None:
+        self.max_block = max_block
+        self.min_token = min_token
+        self.entities: Dict[str, EntityProxy] = {}
+        self.blocks: Dict[Token, List[str]] = {}
+        self.tokens: Dict[str, Set[Token]] = {}
+
+    def tokenize(self, proxy: EntityProxy) -> Set[Token]:
+        """Generate the blocking keys for the given entity."""
+        tokens: Set[Token] = set()
+        for group, values in proxy.get_type_inverted(matchable=True).items():
+            type_ = registry.groups[group]
+            if type_ == registry.name:
+                for value in values:
+                    name = normalize(value, ascii=True)
+                    if name is None:
+                        continue
+                    for token in name.split():
+                        if len(token) >= self.min_token:
+                            tokens.add((group, token))
+            elif type_ in BLOCKING_TYPES:
+                for value in values:
+                    tokens.add((group, value))
+        return tokens
+
+    def add(self, proxy: EntityProxy) -> None:
+        """Add an entity to the index. Entities which do not have an ID or
+        are of a schema that cannot be matched are skipped. Fragments with the
+        same ID are merged into a copy of the first one; fragments which cannot
+        be merged (e.g. because of incompatible schemata) are skipped."""
+        if proxy.id is None or not proxy.schema.matchable:
+            return
+        if proxy.id in self.entities:
+            try:
+                self.entities[proxy.id].merge(proxy)
+            except InvalidData as exc:
+                log.warning("Cannot index entity fragment: %s", exc)
+                return
+        else:
+            self.entities[proxy.id] = proxy.clone()
+            self.tokens[proxy.id] = set()
+        known = self.tokens[proxy.id]
+        for token in self.tokenize(proxy):
+            if token not in known:
+                known.add(token)
+                self.blocks.setdefault(token, []).append(proxy.id)
+
+    def add_many(self, proxies: Iterable[EntityProxy]) -> None:
+        for proxy in proxies:
+            self.add(proxy)
+
+    def candidates(self, entity_id: str) -> Set[str]:
+        """Return the IDs of all entities sharing a (not too common) block with
+        the given entity."""
+        candidates: Set[str] = set()
+        for token in self.tokens.get(entity_id, []):
+            block = self.blocks[token]
+            if len(block) > self.max_block:
+                continue
+            candidates.update(block)
+        candidates.discard(entity_id)
+        return candidates
+
+    def pairs(self) -> Generator[Tuple[EntityProxy, EntityProxy], None, None]:
+        """Generate each pair of entities which share a block and whose schemata
+        can be matched exactly once."""
+        for entity_id, left in self.entities.items():
+            for other_id in sorted(self.candidates(entity_id)):
+                if other_id <= entity_id:
+                    continue
+                right = self.entities[other_id]
+                if not left.schema.can_match(right.schema):
+                    continue
+                yield (left, right)
@@ -1,19 +1,195 @@
+import os
 import click
+import heapq
+import orjson
+import shutil
+import tempfile
+from zlib import crc32
 from pathlib import Path
-from typing import Dict, Optional, Type
+from typing import Any, BinaryIO, Dict, Generator, Generic, Iterable, List
+from typing import Optional, Tuple, Type
 
+from followthemoney import model
 from followthemoney.proxy import EntityProxy, E
 from followthemoney.namespace import Namespace
 from followthemoney.cli.cli import cli
 from followthemoney.cli.util import InPath, OutPath, path_entities
-from followthemoney.cli.util import path_writer, write_entity
+from followthemoney.cli.util import path_entity_writer
+from followthemoney.util import MEGABYTE
+
+# Rough estimate of the memory used by a buffered proxy in addition to its
+# property values (object, dicts, lists, string headers).
+ENTITY_OVERHEAD = 1024
+PARTITIONS = 64
+
+
+class ExternalAggregator(Generic[E]):
+    """Merge entity fragments with the same ID while keeping memory use bounded.
+
+    Fragments are merged in an in-memory buffer. Once the estimated size of the
+    buffer exceeds ``memory_limit`` (in bytes), it is spilled to a set of
+    temporary files, hash-partitioned by entity ID. When iterating the result,
+    each partition is merged on its own and the partitions are then combined
+    so that entities are emitted in the order in which their ID was first seen.
+    This makes the output identical to that of an in-memory aggregation.
+    Partitions which are larger than ``memory_limit`` are split up again
+    before they are merged.
+
+    The aggregator removes its temporary files once it has been iterated, or
+    when it is used as a context manager and the block is left."""
+
+    def __init__(
+        self,
+        entity_type: Type[E],
+        memory_limit: Optional[int] = None,
+        partitions: int = PARTITIONS,
+    ) -> None:
+        self.entity_type = entity_type
+        self.memory_limit = memory_limit
+        self.partitions = partitions
+        self.buffer: Dict[str, E] = {}
+        self.first_seen: Dict[str, int] = {}
+        self.buffer_size = 0
+        self.counter = 0
+        self.spill_dir: Optional[str] = None
+        self.spill_fhs: Dict[int, BinaryIO] = {}
+
+    def add(self, entity: E) -> None:
+        if entity.id is None:
+            return
+        self.counter += 1
+        if entity.id in self.buffer:
+            self.buffer[entity.id].merge(entity)
+        else:
+            self.buffer[entity.id] = entity
+            self.first_seen[entity.id] = self.counter
+        self.buffer_size += len(entity) + ENTITY_OVERHEAD
+        if self.memory_limit is not None and self.buffer_size > self.memory_limit:
+            self.spill()
+
+    def _partition_path(self, partition: int) -> str:
+        assert self.spill_dir is not None
+        return os.path.join(self.spill_dir, "part-%05d.json" % partition)
+
+    def spill(self) -> None:
+        """Write the current buffer to the partition files on disk."""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="ftm-aggregate-")
+        for entity_id, entity in self.buffer.items():
+            partition = crc32(entity_id.encode("utf-8")) % self.partitions
+            fh = self.spill_fhs.get(partition)
+            if fh is None:
+                fh = open(self._partition_path(partition), "wb")
+                self.spill_fhs[partition] = fh
+            record = (self.first_seen[entity_id], entity.to_dict())
+            fh.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        self.buffer = {}
+        self.first_seen = {}
+        self.buffer_size = 0
+
+    def _split_partition(self, path: str, depth: int) -> List[str]:
+        """Split a partition file which is too large to be merged in memory,
+        using a different hash for each level of splitting."""
+        assert self.memory_limit is not None
+        size = os.path.getsize(path)
+        count = min(self.partitions, (size // self.memory_limit) + 2)
+        fhs: Dict[int, BinaryIO] = {}
+        try:
+            with open(path, "rb") as fh:
+                while line := fh.readline():
+                    entity_id = orjson.loads(line)[1]["id"]
+                    part = crc32(entity_id.encode("utf-8"), depth) % count
+                    part_fh = fhs.get(part)
+                    if part_fh is None:
+                        part_fh = open("%s.%d" % (path, part), "wb")
+                        fhs[part] = part_fh
+                    part_fh.write(line)
+        finally:
+            for part_fh in fhs.values():
+                part_fh.close()
+        os.unlink(path)
+        return ["%s.%d" % (path, part) for part in sorted(fhs.keys())]
+
+    def _merge_partition(self, path: str, depth: int = 1) -> str:
+        """Merge all spilled fragments of one partition and write them to a
+        run file, ordered by the position in which each ID was first seen."""
+        run_path = path + ".run"
+        if self.memory_limit is not None and os.path.getsize(path) > self.memory_limit:
+            parts = self._split_partition(path, depth)
+            # If all fragments belong to one entity, it must be merged in memory:
+            if len(parts) > 1:
+                runs = [self._merge_partition(p, depth + 1) for p in parts]
+                readers = [self._read_run(r) for r in runs]
+                with open(run_path, "wb") as fh:
+                    for record in heapq.merge(*readers, key=lambda r: r[0]):
+                        fh.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+                for run in runs:
+                    os.unlink(run)
+                return run_path
+            path = parts[0]
+        entities: Dict[str, Tuple[int, E]] = {}
+        with open(path, "rb") as fh:
+            while line := fh.readline():
+                seen, data = orjson.loads(line)
+                entity = self.entity_type.from_dict(model, data, trusted=True)
+                assert entity.id is not None, data
+                if entity.id in entities:
+                    first, merged = entities[entity.id]
+                    merged.merge(entity)
+                    entities[entity.id] = (min(first, seen), merged)
+                else:
+                    entities[entity.id] = (seen, entity)
+        os.unlink(path)
+        with open(run_path, "wb") as fh:
+            for seen, entity in sorted(entities.values(), key=lambda r: r[0]):
+                record = (seen, entity.to_dict())
+                fh.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        return run_path
+
+    def _read_run(self, path: str) -> Generator[Tuple[int, Any], None, None]:
+        with open(path, "rb") as fh:
+            while line := fh.readline():
+                seen, data = orjson.loads(line)
+                yield (seen, data)
+
+    def __iter__(self) -> Generator[E, None, None]:
+        if self.spill_dir is None:
+            yield from self.buffer.values()
+            return
+        try:
+            self.spill()
+            for fh in self.spill_fhs.values():
+                fh.close()
+            runs: List[Iterable[Tuple[int, Any]]] = []
+            for partition in sorted(self.spill_fhs.keys()):
+                run_path = self._merge_partition(self._partition_path(partition))
+                runs.append(self._read_run(run_path))
+            for _, data in heapq.merge(*runs, key=lambda r: r[0]):
+                yield self.entity_type.from_dict(model, data, trusted=True)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Remove the temporary files of the aggregator."""
+        for fh in self.spill_fhs.values():
+            fh.close()
+        self.spill_fhs = {}
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+
+    def __enter__(self) -> "ExternalAggregator[E]":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
 
 
 def sorted_aggregate(path: Path, outpath: Path, entity_type: Type[E]) -> None:
     """Aggregate entities based on the premise that the fragments in the source
     stream are sorted by their ID."""
     entity: Optional[E] = None
-    with path_writer(outpath) as outfh:
+    with path_entity_writer(outpath) as writer:
         for next_entity in path_entities(path, entity_type=entity_type):
             if entity is None:
                 entity = next_entity
@@ -21,30 +197,33 @@ def sorted_aggregate(path: Path, outpath: Path, entity_type: Type[E]) -> None:
             if next_entity.id == entity.id:
                 entity = entity.merge(next_entity)
                 continue
-            write_entity(outfh, entity)
+            writer.write(entity)
             entity = next_entity
 
         if entity is not None:
-            write_entity(outfh, entity)
+            writer.write(entity)
 
 
 @cli.command("aggregate", help="Aggregate multiple fragments of entities")
 @click.option("-i", "--infile", type=InPath, default="-")
 @click.option("-o", "--outfile", type=OutPath, default="-")
-def aggregate(infile: Path, outfile: Path) -> None:
-    buffer: Dict[str, EntityProxy] = {}
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Spill fragments to disk when the buffer exceeds this many megabytes",
+)
+def aggregate(infile: Path, outfile: Path, memory_limit: Optional[int]) -> None:
+    limit = memory_limit * MEGABYTE if memory_limit is not None else None
     namespace = Namespace(None)
     try:
-        with path_writer(outfile) as outfh:
-            for entity in path_entities(infile, EntityProxy):
-                entity = namespace.apply(entity)
-                if entity.id in buffer:
-                    buffer[entity.id].merge(entity)
-                elif entity.id is not None:
-                    buffer[entity.id] = entity
-
-            for entity in buffer.values():
-                write_entity(outfh, entity)
+        with ExternalAggregator(EntityProxy, memory_limit=limit) as aggregator:
+            with path_entity_writer(outfile) as writer:
+                for entity in path_entities(infile, EntityProxy):
+                    aggregator.add(namespace.apply(entity))
+
+                for entity in aggregator:
+                    writer.write(entity)
     except BrokenPipeError:
         raise click.Abort()
 
@@ -2,19 +2,47 @@ import sys
 import click
 import orjson
 import logging
+from io import BytesIO
+from queue import Queue
 from pathlib import Path
-from typing import Optional, BinaryIO, List, Any, Dict
+from collections import deque
+from itertools import islice
+from functools import partial
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Optional, BinaryIO, List, Any, Dict, Generator, Iterable
+from typing import Callable, Deque
 from banal import ensure_list
 
-from followthemoney import model
+from followthemoney import model, model_path, snapshot_path
+from followthemoney.model import write_snapshot
 from followthemoney.namespace import Namespace
-from followthemoney.cli.util import InPath, OutPath, path_entities
-from followthemoney.cli.util import path_writer, write_entity
+from followthemoney.cli.util import InPath, OutPath, path_entities, path_lines
+from followthemoney.cli.util import FORMATS, make_entity_writer, path_entity_writer
 from followthemoney.proxy import EntityProxy
 
+# The number of batches which can be processed or waiting to be written at
+# the same time, for each worker process of `ftm validate`:
+BATCHES_PER_WORKER = 2
+
 
 @click.group(help="Utility for FollowTheMoney graph data")
-def cli() -> None:
+@click.option(
+    "--trusted",
+    is_flag=True,
+    default=False,
+    help="Read input entities without re-checking them, e.g. the output of ftm",
+)
+@click.option(
+    "--format",
+    type=click.Choice(FORMATS),
+    default="json",
+    help="Format of the output entity streams (the input format is detected)",
+)
+@click.pass_context
+def cli(ctx: click.Context, trusted: bool, format: str) -> None:
+    ctx.ensure_object(dict)
+    ctx.obj["trusted"] = trusted
+    ctx.obj["format"] = format
     fmt = "%(name)s [%(levelname)s] %(message)s"
     logging.basicConfig(stream=sys.stderr, level=logging.INFO, format=fmt)
 
@@ -26,18 +54,121 @@ def dump_model(outfile: BinaryIO) -> None:
     outfile.write(orjson.dumps(model.to_dict(), option=f))
 
 
+def validate_entity(entity: EntityProxy) -> EntityProxy:
+    """Re-clean all the property values of the given entity."""
+    clean = model.make_entity(entity.schema)
+    clean.id = entity.id
+    for prop, value in entity.itervalues():
+        clean.add(prop, value)
+    return clean
+
+
+def validate_batch(lines: List[bytes], format: str = "json") -> bytes:
+    """Validate a batch of raw entity JSON lines and return the result,
+    serialised in the given format. Raw bytes are used to minimise pickling
+    between processes."""
+    out = BytesIO()
+    writer = make_entity_writer(out, format=format)
+    for line in lines:
+        entity = EntityProxy.from_dict(model, orjson.loads(line), cleaned=False)
+        writer.write(validate_entity(entity))
+    writer.flush()
+    return out.getvalue()
+
+
+def _batches(
+    lines: Iterable[bytes], batch_size: int
+) -> Generator[List[bytes], None, None]:
+    lines = iter(lines)
+    while batch := list(islice(lines, batch_size)):
+        yield batch
+
+
+def _process_batches(
+    pool: Pool,
+    func: Callable[[List[bytes]], bytes],
+    batches: Iterable[List[bytes]],
+    window: int,
+    ordered: bool = True,
+) -> Generator[bytes, None, None]:
+    """Process batches using a pool of workers, with at most ``window`` batches
+    in flight. Unlike ``Pool.imap``, this does not read ahead in the input or
+    buffer results without bounds if the output is written slowly."""
+    if ordered:
+        pending: Deque["AsyncResult[bytes]"] = deque()
+        for batch in batches:
+            if len(pending) >= window:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(func, (batch,)))
+        while len(pending):
+            yield pending.popleft().get()
+        return
+
+    done: "Queue[Any]" = Queue()
+    in_flight = 0
+    for batch in batches:
+        while in_flight >= window:
+            result = done.get()
+            in_flight -= 1
+            if isinstance(result, BaseException):
+                raise result
+            yield result
+        pool.apply_async(func, (batch,), callback=done.put, error_callback=done.put)
+        in_flight += 1
+    while in_flight > 0:
+        result = done.get()
+        in_flight -= 1
+        if isinstance(result, BaseException):
+            raise result
+        yield result
+
+
+@cli.command("model-snapshot", help="Write a snapshot of the model definitions")
+@click.option("-o", "--outfile", type=click.Path(dir_okay=False), default=None)
+def model_snapshot(outfile: Optional[str]) -> None:
+    write_snapshot(model_path, outfile or snapshot_path)
+
+
 @cli.command("validate", help="Re-parse and validate the given data")
 @click.option("-i", "--infile", type=InPath, default="-")
 @click.option("-o", "--outfile", type=OutPath, default="-")
-def validate(infile: Path, outfile: Path) -> None:
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes used to clean entities",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=1000,
+    help="Number of entities sent to a worker process at a time",
+)
+@click.option(
+    "--ordered/--unordered",
+    is_flag=True,
+    default=True,
+    help="Retain the order of the input stream when using multiple workers",
+)
+def validate(
+    infile: Path, outfile: Path, workers: int, batch_size: int, ordered: bool
+) -> None:
     try:
-        with path_writer(outfile) as outfh:
-            for entity in path_entities(infile, EntityProxy, cleaned=False):
-                clean = model.make_entity(entity.schema)
-                clean.id = entity.id
-                for prop, value in entity.itervalues():
-                    clean.add(prop, value)
-                write_entity(outfh, clean)
+        with path_entity_writer(outfile) as writer:
+            if workers == 1:
+                for entity in path_entities(infile, EntityProxy, cleaned=False):
+                    writer.write(validate_entity(entity))
+                return
+            batches = _batches(path_lines(infile), batch_size)
+            window = workers * BATCHES_PER_WORKER
+            with Pool(workers) as pool:
+                validator = partial(validate_batch, format=writer.format)
+                results = _process_batches(
+                    pool, validator, batches, window, ordered=ordered
+                )
+                for data in results:
+                    writer.write_bytes(data)
     except BrokenPipeError:
         raise click.Abort()
 
@@ -46,7 +177,7 @@ def validate(infile: Path, outfile: Path) -> None:
 @click.option("-i", "--infile", type=InPath, default="-")  # noqa
 @click.option("-o", "--outfile", type=OutPath, default="-")  # noqa
 def import_vis(infile: Path, outfile: Path) -> None:
-    with path_writer(outfile) as outfh:
+    with path_entity_writer(outfile) as writer:
         with open(infile, "rb") as infh:
             data: Dict[str, Any] = orjson.loads(infh.read())
             if "entities" in data:
@@ -57,7 +188,7 @@ def import_vis(infile: Path, outfile: Path) -> None:
                 raise click.ClickException("No entities found in VIS file")
             for entity_data in ensure_list(entities):
                 entity = EntityProxy.from_dict(model, entity_data)
-                write_entity(outfh, entity)
+                writer.write(entity)
 
 
 @cli.command("sign", help="Apply a HMAC signature to entity IDs")
@@ -67,10 +198,10 @@ def import_vis(infile: Path, outfile: Path) -> None:
 def sign(infile: Path, outfile: Path, signature: Optional[str]) -> None:
     ns = Namespace(signature)
     try:
-        with path_writer(outfile) as outfh:
+        with path_entity_writer(outfile) as writer:
             for entity in path_entities(infile, EntityProxy):
                 signed = ns.apply(entity)
-                write_entity(outfh, signed)
+                writer.write(signed)
     except BrokenPipeError:
         raise click.Abort()
 
@@ -1,17 +1,20 @@
 import click
-from typing import List, TextIO, Generator
+from typing import List, Optional, TextIO, Generator
 from pathlib import Path
 from contextlib import contextmanager
 
 from followthemoney.cli.cli import cli
+from followthemoney.compression import COMPRESSIONS
 from followthemoney.cli.util import InPath, OutPath, export_stream
 from followthemoney.export.csv import CSVExporter
 from followthemoney.export.rdf import RDFExporter
 from followthemoney.export.excel import ExcelExporter
+from followthemoney.export.parquet import ParquetExporter, BATCH_SIZE
 from followthemoney.export.graph import edge_types, DEFAULT_EDGE_TYPES
 from followthemoney.export.graph import NXGraphExporter
 from followthemoney.export.neo4j import Neo4JCSVExporter
-from followthemoney.export.neo4j import CypherGraphExporter
+from followthemoney.export.neo4j import CypherGraphExporter, NEO4J_COMPRESSIONS
+from followthemoney.util import MEGABYTE
 
 
 @contextmanager
@@ -32,8 +35,40 @@ def text_out(path: Path) -> Generator[TextIO, None, None]:
     default=".",
     help="output directory",
 )
-def export_csv(infile: Path, outdir: Path) -> None:
-    exporter = CSVExporter(outdir)
+@click.option(
+    "--compression",
+    type=click.Choice(COMPRESSIONS),
+    default=None,
+    help="Compress the CSV files, e.g. using gzip or zstd",
+)
+def export_csv(infile: Path, outdir: Path, compression: Optional[str]) -> None:
+    try:
+        exporter = CSVExporter(outdir, compression=compression)
+    except ImportError as exc:
+        raise click.ClickException(str(exc))
+    export_stream(exporter, infile)
+
+
+@cli.command("export-parquet", help="Export to Parquet, one file per schema")
+@click.option("-i", "--infile", type=InPath, default="-")
+@click.option(
+    "-o",
+    "--outdir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=".",
+    help="output directory",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=BATCH_SIZE,
+    help="Number of entities written to each file at a time",
+)
+def export_parquet(infile: Path, outdir: Path, batch_size: int) -> None:
+    try:
+        exporter = ParquetExporter(outdir, batch_size=batch_size)
+    except ImportError as exc:
+        raise click.ClickException(str(exc))
     export_stream(exporter, infile)
 
 
@@ -59,9 +94,17 @@ def export_excel(infile: Path, outfile: Path) -> None:
     default=True,
     help="Generate full predicates",
 )
-def export_rdf(infile: Path, outfile: Path, qualified: bool = True) -> None:
+@click.option(
+    "--rdflib",
+    is_flag=True,
+    default=False,
+    help="Serialise entities using rdflib (slower)",
+)
+def export_rdf(
+    infile: Path, outfile: Path, qualified: bool = True, rdflib: bool = False
+) -> None:
     with text_out(outfile) as fh:
-        exporter = RDFExporter(fh, qualified=qualified)
+        exporter = RDFExporter(fh, qualified=qualified, use_rdflib=rdflib)
         export_stream(exporter, infile)
 
 
@@ -93,9 +136,18 @@ def export_gexf(infile: Path, outfile: Path, edge_types: List[str]) -> None:
     default=DEFAULT_EDGE_TYPES,
     help="Property types to be reified into graph edges.",
 )
-def export_cypher(infile: Path, outfile: Path, edge_types: List[str]) -> None:
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Megabytes of node IDs to keep in memory before using a temporary file",
+)
+def export_cypher(
+    infile: Path, outfile: Path, edge_types: List[str], memory_limit: Optional[int]
+) -> None:
+    limit = memory_limit * MEGABYTE if memory_limit is not None else None
     with text_out(outfile) as fh:
-        exporter = CypherGraphExporter(fh, edge_types=edge_types)
+        exporter = CypherGraphExporter(fh, edge_types=edge_types, memory_limit=limit)
         export_stream(exporter, infile)
 
 
@@ -116,6 +168,33 @@ def export_cypher(infile: Path, outfile: Path, edge_types: List[str]) -> None:
     default=DEFAULT_EDGE_TYPES,
     help="Property types to be reified into graph edges.",
 )
-def export_neo4j_bulk(infile: Path, outdir: Path, edge_types: List[str]) -> None:
-    exporter = Neo4JCSVExporter(outdir, edge_types=edge_types)
+@click.option(
+    "--compression",
+    type=click.Choice(NEO4J_COMPRESSIONS),
+    default=None,
+    help="Compress the CSV files using gzip, which neo4j-admin can import",
+)
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Megabytes of node IDs to keep in memory before using a temporary file",
+)
+def export_neo4j_bulk(
+    infile: Path,
+    outdir: Path,
+    edge_types: List[str],
+    compression: Optional[str],
+    memory_limit: Optional[int],
+) -> None:
+    limit = memory_limit * MEGABYTE if memory_limit is not None else None
+    try:
+        exporter = Neo4JCSVExporter(
+            outdir,
+            edge_types=edge_types,
+            compression=compression,
+            memory_limit=limit,
+        )
+    except ImportError as exc:
+        raise click.ClickException(str(exc))
     export_stream(exporter, infile)
@@ -0,0 +1,229 @@
+import os
+import mmap
+import click
+import orjson
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Generator, Generic, List, Optional, Tuple, Type
+
+from followthemoney import model
+from followthemoney.proxy import E
+from followthemoney.exc import InvalidData
+from followthemoney.compression import path_compression
+from followthemoney.cli.cli import cli
+from followthemoney.cli.sort import SortKey, external_sort
+from followthemoney.cli.util import MAX_LINE, READ_BUFFER, is_binary_stream
+from followthemoney.util import MEGABYTE, PathLike
+
+# The index file starts with a header (magic, version, number of entries, the
+# position of the keys and the size of the indexed file). It is followed by a
+# table of fixed-size entries sorted by entity ID, each of which points to an
+# ID in the key section and to a line of the entity file.
+INDEX_MAGIC = b"FTMI"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<4sB3xQQQ")
+ENTRY = struct.Struct("<QIQI")
+INDEX_SUFFIX = ".idx"
+
+
+def index_path(path: PathLike) -> str:
+    """Get the default path of the index of an entity file."""
+    return str(path) + INDEX_SUFFIX
+
+
+def _entry_key(line: bytes) -> SortKey:
+    return (orjson.loads(line)[0],)
+
+
+def _entries(fh: BinaryIO) -> Generator[bytes, None, None]:
+    offset = 0
+    while line := fh.readline(MAX_LINE):
+        if line.strip():
+            entity_id = orjson.loads(line).get("id")
+            if entity_id is not None:
+                entry = (entity_id, offset, len(line))
+                yield orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+        offset += len(line)
+
+
+def build_index(
+    path: PathLike,
+    outpath: Optional[PathLike] = None,
+    memory_limit: int = 500 * MEGABYTE,
+) -> str:
+    """Build an index which maps the ID of each entity in a file of JSON lines
+    to the position of the line(s) which contain it. The entries are sorted
+    using bounded memory, see :func:`~followthemoney.cli.sort.external_sort`.
+    Returns the path of the index file."""
+    if path_compression(path) is not None:
+        raise InvalidData("Compressed entity files cannot be indexed.")
+    outpath = str(outpath or index_path(path))
+    size = os.path.getsize(path)
+    directory = os.path.dirname(os.path.abspath(outpath))
+    fd, tmp_path = tempfile.mkstemp(prefix=".ftm-index-", dir=directory)
+    try:
+        with open(path, "rb", buffering=READ_BUFFER) as fh:
+            if is_binary_stream(fh):
+                raise InvalidData("Binary entity streams cannot be indexed.")
+            with os.fdopen(fd, "wb") as outfh, tempfile.TemporaryFile() as keys:
+                outfh.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0, 0, size))
+                count = 0
+                keys_size = 0
+                last: Optional[bytes] = None
+                lines = _entries(fh)
+                for line in external_sort(lines, _entry_key, memory_limit):
+                    entity_id, offset, length = orjson.loads(line)
+                    key = entity_id.encode("utf-8")
+                    # Fragments of the same entity share their key:
+                    if key != last:
+                        key_offset = keys_size
+                        keys.write(key)
+                        keys_size += len(key)
+                        last = key
+                    outfh.write(ENTRY.pack(key_offset, len(key), offset, length))
+                    count += 1
+                keys_start = HEADER.size + (count * ENTRY.size)
+                keys.seek(0)
+                shutil.copyfileobj(keys, outfh)
+                outfh.seek(0)
+                header = HEADER.pack(
+                    INDEX_MAGIC, INDEX_VERSION, count, keys_start, size
+                )
+                outfh.write(header)
+        os.replace(tmp_path, outpath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return outpath
+
+
+class IndexedEntityFile(Generic[E]):
+    """Read individual entities from a file of JSON lines, using the index
+    built by :func:`build_index` (or ``ftm index``). The index is memory-mapped
+    and searched for the given ID, so that only the lines which contain the
+    entity are read. Multiple fragments of an entity are merged."""
+
+    def __init__(
+        self,
+        path: PathLike,
+        entity_type: Type[E],
+        index: Optional[PathLike] = None,
+    ) -> None:
+        self.path = path
+        self.entity_type = entity_type
+        self.index_path = str(index or index_path(path))
+        self.fh = open(path, "rb")
+        try:
+            with open(self.index_path, "rb") as ifh:
+                self.index = mmap.mmap(ifh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # The index file is empty:
+            self.fh.close()
+            raise InvalidData("Invalid entity index: %s" % self.index_path)
+        except OSError:
+            self.fh.close()
+            raise
+        try:
+            header = HEADER.unpack_from(self.index, 0)
+        except struct.error:
+            header = (None, None, 0, 0, 0)
+        magic, version, self.count, self.keys_start, size = header
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise InvalidData("Invalid entity index: %s" % self.index_path)
+        if size != os.path.getsize(path):
+            self.close()
+            raise InvalidData("The entity index is out of date: %s" % self.index_path)
+
+    def _entry(self, pos: int) -> Tuple[bytes, int, int]:
+        key_offset, key_length, offset, length = ENTRY.unpack_from(
+            self.index, HEADER.size + (pos * ENTRY.size)
+        )
+        start = self.keys_start + key_offset
+        return self.index[start : start + key_length], offset, length
+
+    def _search(self, key: bytes) -> int:
+        """Find the first entry with the given key, or where it would be."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def offsets(self, entity_id: str) -> List[Tuple[int, int]]:
+        """Get the position and length of each line which contains a fragment
+        of the given entity, in the order of the file."""
+        key = entity_id.encode("utf-8")
+        offsets: List[Tuple[int, int]] = []
+        pos = self._search(key)
+        while pos < self.count:
+            entry_key, offset, length = self._entry(pos)
+            if entry_key != key:
+                break
+            offsets.append((offset, length))
+            pos += 1
+        return offsets
+
+    def get(self, entity_id: str) -> Optional[E]:
+        """Read the entity with the given ID, or return ``None``."""
+        entity: Optional[E] = None
+        for offset, length in self.offsets(entity_id):
+            self.fh.seek(offset)
+            data = orjson.loads(self.fh.read(length))
+            fragment = self.entity_type.from_dict(model, data)
+            entity = fragment if entity is None else entity.merge(fragment)
+        return entity
+
+    def __contains__(self, entity_id: Any) -> bool:
+        if not isinstance(entity_id, str):
+            return False
+        key = entity_id.encode("utf-8")
+        pos = self._search(key)
+        return pos < self.count and self._entry(pos)[0] == key
+
+    def __len__(self) -> int:
+        """The number of entity fragments in the file."""
+        return int(self.count)
+
+    def close(self) -> None:
+        self.index.close()
+        self.fh.close()
+
+    def __enter__(self) -> "IndexedEntityFile[E]":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+@cli.command("index", help="Build an index to look up entities in a file by ID")
+@click.option(
+    "-i",
+    "--infile",
+    type=click.Path(dir_okay=False, exists=True, path_type=Path),
+    required=True,
+)
+@click.option(
+    "-o",
+    "--outfile",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    default=None,
+    help="Path of the index (default: the input file with the suffix .idx)",
+)
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=1),
+    default=500,
+    help="Megabytes of index entries to sort in memory before using run files",
+)
+def index(infile: Path, outfile: Optional[Path], memory_limit: int) -> None:
+    try:
+        build_index(infile, outfile, memory_limit * MEGABYTE)
+    except InvalidData as exc:
+        raise click.ClickException(str(exc))
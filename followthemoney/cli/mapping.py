@@ -1,17 +1,28 @@
+import os
 import sys
 import click
+import shutil
+import tempfile
 from pathlib import Path
 from banal import keys_values
-from typing import Generator, List, TextIO, Tuple
+from multiprocessing import Pool
+from typing import Any, Dict, Generator, List, Optional, TextIO, Tuple, cast
 from contextlib import contextmanager
 
 from followthemoney import model
 from followthemoney.namespace import Namespace
 from followthemoney.mapping.query import QueryMapping
 from followthemoney.mapping.csv import CSVSource
+from followthemoney.mapping.sql import SQLSource
 from followthemoney.cli.cli import cli
 from followthemoney.cli.util import InPath, OutPath, load_mapping_file
-from followthemoney.cli.util import path_writer, write_entity
+from followthemoney.cli.util import WRITE_BUFFER, EntityWriter, make_entity_writer
+from followthemoney.cli.util import path_entity_writer
+
+# A unit of work for `ftm map --workers`: the dataset name, the query mapping,
+# whether to sign entity IDs, the partition of the query to map (if any), the
+# directory and the format to write the entities in.
+MappingJob = Tuple[str, Dict[str, Any], bool, Optional[Tuple[int, int]], str, str]
 
 
 @contextmanager
@@ -23,6 +34,62 @@ def input_file(path: Path) -> Generator[TextIO, None, None]:
         yield fh
 
 
+def map_job(job: MappingJob) -> str:
+    """Execute a query mapping (or a partition of it) and write the resulting
+    entities to a temporary file. Used as a worker by `ftm map`."""
+    dataset, data, sign, partition, directory, format = job
+    query = model.make_mapping(data, key_prefix=dataset)
+    if partition is not None:
+        source = cast(SQLSource, query.source)
+        source.set_partition(*partition)
+    ns = Namespace(dataset)
+    fd, path = tempfile.mkstemp(suffix=".ijson", dir=directory)
+    with os.fdopen(fd, "wb") as fh:
+        writer = make_entity_writer(fh, format=format)
+        for record in query.source.records:
+            for entity in query.map(record).values():
+                if sign:
+                    entity = ns.apply(entity)
+                writer.write(entity)
+        writer.flush()
+    return path
+
+
+def _mapping_jobs(
+    config: Dict[str, Any], sign: bool, workers: int, directory: str, format: str
+) -> Generator[MappingJob, None, None]:
+    for dataset, meta in config.items():
+        for data in keys_values(meta, "queries", "query"):
+            # Parse the mapping to validate it before starting the workers:
+            query = model.make_mapping(data, key_prefix=dataset)
+            source = query.source
+            if isinstance(source, SQLSource) and source.partition_column:
+                count = source.partition_count or workers
+                for index in range(count):
+                    yield (dataset, data, sign, (index, count), directory, format)
+            else:
+                yield (dataset, data, sign, None, directory, format)
+
+
+def run_mapping_parallel(
+    writer: EntityWriter, config: Dict[str, Any], sign: bool, workers: int
+) -> None:
+    """Run the queries of a mapping file in a pool of worker processes, and
+    combine their output in the order of the queries. SQL queries with a
+    partition column are split up into multiple jobs."""
+    directory = tempfile.mkdtemp(prefix="ftm-map-")
+    try:
+        jobs = _mapping_jobs(config, sign, workers, directory, writer.format)
+        with Pool(workers) as pool:
+            for path in pool.imap(map_job, list(jobs)):
+                with open(path, "rb") as fh:
+                    while data := fh.read(WRITE_BUFFER):
+                        writer.write_bytes(data)
+                os.unlink(path)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
 @cli.command("map", help="Execute a mapping file and emit objects")
 @click.option("-o", "--outfile", type=OutPath, default="-")
 @click.option(
@@ -31,11 +98,24 @@ def input_file(path: Path) -> Generator[TextIO, None, None]:
     default=True,
     help="Apply HMAC signature",
 )
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes used to execute queries (with more than one, the "
+    "output of each job is written once it has finished, in query order)",
+)
 @click.argument("mapping_yaml", type=click.Path(exists=True, path_type=Path))
-def run_mapping(outfile: Path, mapping_yaml: Path, sign: bool = True) -> None:
+def run_mapping(
+    outfile: Path, mapping_yaml: Path, sign: bool = True, workers: int = 1
+) -> None:
     config = load_mapping_file(mapping_yaml)
     try:
-        with path_writer(outfile) as outfh:
+        with path_entity_writer(outfile) as writer:
+            if workers > 1:
+                run_mapping_parallel(writer, config, sign, workers)
+                return
             for dataset, meta in config.items():
                 ns = Namespace(dataset)
                 for mapping in keys_values(meta, "queries", "query"):
@@ -43,7 +123,7 @@ def run_mapping(outfile: Path, mapping_yaml: Path, sign: bool = True) -> None:
                     for entity in entities:
                         if sign:
                             entity = ns.apply(entity)
-                        write_entity(outfh, entity)
+                        writer.write(entity)
     except BrokenPipeError:
         raise click.Abort()
     except Exception as exc:
@@ -60,26 +140,26 @@ def run_mapping(outfile: Path, mapping_yaml: Path, sign: bool = True) -> None:
 def stream_mapping(
     infile: Path, outfile: Path, mapping_yaml: Path, sign: bool = True
 ) -> None:
-    queries: List[Tuple[str, QueryMapping]] = []
+    queries: List[Tuple[Namespace, QueryMapping]] = []
     config = load_mapping_file(mapping_yaml)
     for dataset, meta in config.items():
+        ns = Namespace(dataset)
         for data in keys_values(meta, "queries", "query"):
             data.pop("database", None)
             data["csv_url"] = "/dev/null"
             query = model.make_mapping(data, key_prefix=dataset)
-            queries.append((dataset, query))
+            queries.append((ns, query))
 
     try:
-        with path_writer(outfile) as outfh:
+        with path_entity_writer(outfile) as writer:
             with input_file(infile) as fh:
                 for record in CSVSource.read_csv(fh):
-                    for (dataset, query) in queries:
-                        ns = Namespace(dataset)
+                    for ns, query in queries:
                         if query.source.check_filters(record):  # type: ignore
                             entities = query.map(record)
                             for entity in entities.values():
                                 if sign:
                                     entity = ns.apply(entity)
-                                write_entity(outfh, entity)
+                                writer.write(entity)
     except BrokenPipeError:
         raise click.Abort()
@@ -7,7 +7,7 @@ from followthemoney.proxy import E, EntityProxy
 from followthemoney.types import registry
 from followthemoney.cli.cli import cli
 from followthemoney.cli.util import InPath, OutPath, path_entities
-from followthemoney.cli.util import path_writer, write_entity
+from followthemoney.cli.util import path_entity_writer
 
 
 def sieve_entity(
@@ -33,7 +33,7 @@ def sieve_entity(
 @click.option(
     "-s",
     "--schema",
-    type=click.Choice(list(model.schemata.keys())),
+    type=click.Choice([s.name for s in model]),
     multiple=True,
     help="Filter out the given schemata.",
 )
@@ -58,10 +58,10 @@ def sieve(
     type: Iterable[str],
 ) -> None:
     try:
-        with path_writer(outfile) as outfh:
+        with path_entity_writer(outfile) as writer:
             for entity in path_entities(infile, EntityProxy):
                 sieved = sieve_entity(entity, schema, property, type)
                 if sieved is not None:
-                    write_entity(outfh, sieved)
+                    writer.write(sieved)
     except BrokenPipeError:
         raise click.Abort()
@@ -0,0 +1,150 @@
+import os
+import click
+import heapq
+import orjson
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Generator, Iterable, Iterator, List, Tuple
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.cli.cli import cli
+from followthemoney.cli.util import InPath, OutPath, MAX_LINE
+from followthemoney.cli.util import path_lines, path_entity_writer
+from followthemoney.util import MEGABYTE
+
+SortKey = Tuple[str, ...]
+# Approximate memory used by a buffered line in addition to its content.
+LINE_OVERHEAD = 128
+# The maximum number of run files which are opened and merged at once.
+MERGE_FAN_IN = 64
+
+
+def id_key(line: bytes) -> SortKey:
+    data = orjson.loads(line)
+    return (data.get("id") or "",)
+
+
+def id_schema_key(line: bytes) -> SortKey:
+    data = orjson.loads(line)
+    return (data.get("id") or "", data.get("schema") or "")
+
+
+def _write_run(directory: str, buffer: List[Tuple[SortKey, bytes]]) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as fh:
+        buffer.sort(key=lambda r: r[0])
+        for _, line in buffer:
+            fh.write(line)
+    return path
+
+
+def _read_run(
+    path: str, key: Callable[[bytes], SortKey]
+) -> Generator[Tuple[SortKey, bytes], None, None]:
+    with open(path, "rb") as fh:
+        while line := fh.readline(MAX_LINE):
+            yield (key(line), line)
+
+
+def _merge_runs(
+    runs: List[str], key: Callable[[bytes], SortKey]
+) -> Iterator[Tuple[SortKey, bytes]]:
+    readers = [_read_run(run, key) for run in runs]
+    return heapq.merge(*readers, key=lambda r: r[0])
+
+
+def _write_merged(
+    directory: str, runs: List[str], key: Callable[[bytes], SortKey]
+) -> str:
+    """Merge several run files into a new one, and remove them."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as fh:
+        for _, line in _merge_runs(runs, key):
+            fh.write(line)
+    for run in runs:
+        os.unlink(run)
+    return path
+
+
+def external_sort(
+    lines: Iterable[bytes],
+    key: Callable[[bytes], SortKey] = id_key,
+    memory_limit: int = 500 * MEGABYTE,
+    fan_in: int = MERGE_FAN_IN,
+) -> Generator[bytes, None, None]:
+    """Sort a stream of JSON lines using a bounded amount of memory.
+
+    Lines are buffered until the buffer exceeds ``memory_limit`` (in bytes),
+    then sorted and written to a temporary run file. The runs are combined
+    using a k-way heap merge. If there are more than ``fan_in`` runs, they are
+    first merged in several passes, so that only that many files are open at
+    a time. The sort is stable, so fragments with the same key retain their
+    relative input order."""
+    buffer: List[Tuple[SortKey, bytes]] = []
+    buffer_size = 0
+    runs: List[str] = []
+    directory = tempfile.mkdtemp(prefix="ftm-sort-")
+    try:
+        for line in lines:
+            if not line.strip():
+                continue
+            if not line.endswith(b"\n"):
+                line = line + b"\n"
+            buffer.append((key(line), line))
+            buffer_size += len(line) + LINE_OVERHEAD
+            if buffer_size > memory_limit:
+                runs.append(_write_run(directory, buffer))
+                buffer = []
+                buffer_size = 0
+
+        if not len(runs):
+            buffer.sort(key=lambda r: r[0])
+            for _, line in buffer:
+                yield line
+            return
+
+        if len(buffer):
+            runs.append(_write_run(directory, buffer))
+            buffer = []
+        while len(runs) > fan_in:
+            # Adjacent runs are merged, which keeps the sort stable:
+            groups = [runs[i : i + fan_in] for i in range(0, len(runs), fan_in)]
+            runs = [_write_merged(directory, group, key) for group in groups]
+        for _, line in _merge_runs(runs, key):
+            yield line
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@cli.command("sort", help="Sort entities by their ID using bounded memory")
+@click.option("-i", "--infile", type=InPath, default="-")
+@click.option("-o", "--outfile", type=OutPath, default="-")
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=1),
+    default=500,
+    help="Megabytes of entity data to sort in memory before using run files",
+)
+@click.option(
+    "--schema/--no-schema",
+    is_flag=True,
+    default=False,
+    help="Sort entities with the same ID by their schema",
+)
+def sort(infile: Path, outfile: Path, memory_limit: int, schema: bool) -> None:
+    key = id_schema_key if schema else id_key
+    try:
+        with path_entity_writer(outfile) as writer:
+            lines = path_lines(infile)
+            for line in external_sort(lines, key, memory_limit * MEGABYTE):
+                # Sorted JSON lines are passed through, other formats need
+                # to be re-encoded from the parsed entity:
+                if writer.format == "json":
+                    writer.write_bytes(line)
+                else:
+                    data = orjson.loads(line)
+                    writer.write(EntityProxy.from_dict(model, data))
+    except BrokenPipeError:
+        raise click.Abort()
@@ -1,20 +1,38 @@
 from contextlib import contextmanager
+import io
 import os
+import sys
 import json
 import yaml
 import click
 import orjson
 from pathlib import Path
 from warnings import warn
-from typing import Any, BinaryIO, Generator, Optional, TextIO, Type
+from typing import Any, BinaryIO, Dict, Generator, List, Optional, TextIO, Tuple
+from typing import Type, cast
 from banal import is_mapping, is_listish, ensure_list
 
 from followthemoney import model
+from followthemoney.compression import MAGIC, compressed_reader, detect_compression
+from followthemoney.compression import open_compressed
+from followthemoney.exc import InvalidData
 from followthemoney.export.common import Exporter
 from followthemoney.proxy import E, EntityProxy
 from followthemoney.util import MEGABYTE, PathLike
 
 MAX_LINE = 200 * MEGABYTE
+# Read and write files in large blocks to reduce the number of system calls:
+READ_BUFFER = 4 * MEGABYTE
+WRITE_BUFFER = 4 * MEGABYTE
+# Entity streams are written either as JSON lines or as binary frames (see
+# `BinaryEntityWriter`). The format of input streams is detected automatically.
+FORMATS = ("json", "binary")
+BINARY_MAGIC = b"FTMB"
+BINARY_VERSION = 1
+MAX_SHAPES = 2**16
+FRAME_ENTITIES = 1000
+FRAME_SIZE = 4 * MEGABYTE
+MAGIC_SIZE = max(len(m) for m in MAGIC.values())
 InPath = click.Path(dir_okay=False, readable=True, path_type=Path, allow_dash=True)
 OutPath = click.Path(dir_okay=False, writable=True, path_type=Path, allow_dash=True)
 
@@ -27,14 +45,132 @@ def write_object(stream: TextIO, obj: Any) -> None:
     stream.write(data + "\n")
 
 
+def _entity_properties(entity: E) -> Dict[str, List[str]]:
+    # Serialise the property values of a plain entity proxy directly, rather
+    # than via the copy made by `EntityProxy.properties`.
+    if type(entity).properties is EntityProxy.properties:
+        return entity._properties
+    return entity.properties
+
+
+def dump_entity(entity: E) -> bytes:
+    """Serialise an entity as a line of JSON, with the ID as the first key."""
+    assert entity.id is not None, entity
+    data: Dict[str, Any] = {"id": entity.id}
+    data.update(entity.context)
+    data["id"] = entity.id
+    data["schema"] = entity.schema.name
+    data["properties"] = _entity_properties(entity)
+    return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+
+
 def write_entity(fh: BinaryIO, entity: E) -> None:
-    data = entity.to_dict()
-    entity_id = data.pop("id")
-    assert entity_id is not None, data
-    sort_data = dict(id=entity_id)
-    sort_data.update(data)
-    out = orjson.dumps(sort_data, option=orjson.OPT_APPEND_NEWLINE)
-    fh.write(out)
+    fh.write(dump_entity(entity))
+
+
+class EntityWriter(object):
+    """Write entities as JSON lines to a binary file handle. Entities are
+    serialised directly from their property values, without making a copy
+    via :meth:`~followthemoney.proxy.EntityProxy.to_dict`."""
+
+    format = "json"
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self.fh = fh
+
+    def write(self, entity: E) -> None:
+        self.fh.write(dump_entity(entity))
+
+    def write_bytes(self, data: bytes) -> None:
+        """Write pre-serialised entity data, e.g. the output of another writer
+        of the same format."""
+        self.fh.write(data)
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+
+class BinaryEntityWriter(EntityWriter):
+    """Write entities as a compact binary stream. Entities are written in frames
+    of up to ``FRAME_ENTITIES`` entities, each of which consists of its length
+    (four bytes, little endian) followed by a JSON array. The array contains the
+    list of shapes defined in the frame, and a list of entities. A shape is the
+    schema and the property names of an entity; each entity is stored as its ID,
+    the index of its shape, its context (or 0) and the values of each property.
+
+    The stream starts with a marker which resets the table of shapes, so that
+    binary streams can be concatenated like JSON lines."""
+
+    format = "binary"
+
+    def __init__(self, fh: BinaryIO) -> None:
+        super().__init__(fh)
+        self.shapes: Dict[Tuple[str, ...], int] = {}
+        self.started = False
+        self.new_shapes: List[Tuple[str, ...]] = []
+        self.records: List[List[Any]] = []
+        self.records_size = 0
+
+    def reset(self) -> None:
+        self.write_frame()
+        self.fh.write(BINARY_MAGIC + bytes((BINARY_VERSION,)))
+        self.shapes = {}
+        self.started = True
+
+    def write(self, entity: E) -> None:
+        assert entity.id is not None, entity
+        if not self.started:
+            self.reset()
+        properties = _entity_properties(entity)
+        key = (entity.schema.name, *properties.keys())
+        shape = self.shapes.get(key)
+        if shape is None:
+            if len(self.shapes) >= MAX_SHAPES:
+                self.reset()
+            shape = self.shapes[key] = len(self.shapes)
+            self.new_shapes.append(key)
+        context: Any = entity.context
+        if len(context) > ("id" in context):
+            context = dict(context)
+            context.pop("id", None)
+        else:
+            context = 0
+        self.records.append([entity.id, shape, context, *properties.values()])
+        self.records_size += len(entity)
+        if len(self.records) >= FRAME_ENTITIES or self.records_size > FRAME_SIZE:
+            self.write_frame()
+
+    def write_frame(self) -> None:
+        """Write the buffered entities as a frame."""
+        if not len(self.records):
+            return
+        data = orjson.dumps([self.new_shapes, self.records])
+        self.fh.write(len(data).to_bytes(4, "little") + data)
+        self.new_shapes = []
+        self.records = []
+        self.records_size = 0
+
+    def write_bytes(self, data: bytes) -> None:
+        self.write_frame()
+        super().write_bytes(data)
+        # The data starts its own table of shapes:
+        self.started = False
+
+    def flush(self) -> None:
+        self.write_frame()
+        super().flush()
+
+
+def make_entity_writer(fh: BinaryIO, format: Optional[str] = None) -> EntityWriter:
+    """Make a writer for the given format of entity stream. By default, the
+    format given to the ``ftm`` command using ``--format`` is used."""
+    if format is None:
+        format = _output_format()
+    if format == "binary":
+        return BinaryEntityWriter(fh)
+    if format == "json":
+        return EntityWriter(fh)
+    raise ValueError("Invalid entity stream format: %r" % format)
 
 
 def _read_one(data: Any, cleaned: bool = True) -> Generator[EntityProxy, None, None]:
@@ -74,12 +210,143 @@ def read_entity(
     return data
 
 
+def _context_option(name: str, default: Any) -> Any:
+    # Set via the options of the `ftm` command, see `followthemoney.cli.cli`.
+    ctx = click.get_current_context(silent=True)
+    if ctx is None or not isinstance(ctx.obj, dict):
+        return default
+    return ctx.obj.get(name, default)
+
+
+def _trusted_input() -> bool:
+    return bool(_context_option("trusted", False))
+
+
+def _output_format() -> str:
+    return str(_context_option("format", "json"))
+
+
+def _peek(fh: BinaryIO, size: int) -> bytes:
+    peek = getattr(fh, "peek", None)
+    if peek is not None:
+        return bytes(peek(size)[:size])
+    if fh.seekable():
+        position = fh.tell()
+        data = fh.read(size)
+        fh.seek(position)
+        return data
+    return b""
+
+
+def is_binary_stream(fh: BinaryIO) -> bool:
+    """Check if the given file handle contains a binary entity stream, rather
+    than JSON lines. This does not consume any data."""
+    return _peek(fh, len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def binary_records(
+    fh: BinaryIO, max_frame: int = MAX_LINE
+) -> Generator[Dict[str, Any], None, None]:
+    """Read the entity dictionaries from a binary entity stream (see
+    :class:`BinaryEntityWriter`)."""
+    shapes: List[Tuple[str, List[str]]] = []
+    read = fh.read
+    while header := read(4):
+        if header == BINARY_MAGIC:
+            version = read(1)
+            if version != bytes((BINARY_VERSION,)):
+                raise InvalidData("Unsupported entity stream version: %r" % version)
+            shapes = []
+            continue
+        size = int.from_bytes(header, "little")
+        if size > max_frame or len(header) < 4:
+            raise InvalidData("Invalid binary entity stream.")
+        new_shapes, records = orjson.loads(read(size))
+        for shape in new_shapes:
+            shapes.append((shape[0], shape[1:]))
+        for record in records:
+            schema, names = shapes[record[1]]
+            data: Dict[str, Any] = {"id": record[0]}
+            if record[2]:
+                data.update(record[2])
+            data["schema"] = schema
+            data["properties"] = dict(zip(names, record[3:]))
+            yield data
+
+
 def binary_entities(
-    fh: BinaryIO, entity_type: Type[E], cleaned: bool = True, max_line: int = MAX_LINE
+    fh: BinaryIO,
+    entity_type: Type[E],
+    cleaned: bool = True,
+    max_line: int = MAX_LINE,
+    trusted: bool = False,
 ) -> Generator[E, None, None]:
+    """Read a stream of entities from JSON lines, or a binary entity stream. If
+    ``trusted`` is set, the entities are constructed without de-duplicating
+    their property values (see :meth:`~followthemoney.proxy.EntityProxy.from_dict`)."""
+    trusted = trusted and cleaned
+    if is_binary_stream(fh):
+        for data in binary_records(fh, max_frame=max_line):
+            yield entity_type.from_dict(model, data, cleaned=cleaned, trusted=trusted)
+        return
     while line := fh.readline(max_line):
         data = orjson.loads(line)
-        yield entity_type.from_dict(model, data, cleaned=cleaned)
+        yield entity_type.from_dict(model, data, cleaned=cleaned, trusted=trusted)
+
+
+def binary_lines(
+    fh: BinaryIO, max_line: int = MAX_LINE
+) -> Generator[bytes, None, None]:
+    if is_binary_stream(fh):
+        for data in binary_records(fh, max_frame=max_line):
+            yield orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+        return
+    while line := fh.readline(max_line):
+        yield line
+
+
+@contextmanager
+def _stdio_buffer(
+    stream: Any, size: int, write: bool = False
+) -> Generator[BinaryIO, None, None]:
+    """Read or write stdin/stdout with a larger buffer than the default one. The
+    standard stream itself is left open."""
+    fh: "io.BufferedIOBase"
+    if write:
+        fh = io.BufferedWriter(stream, buffer_size=size)
+    else:
+        fh = io.BufferedReader(stream, buffer_size=size)
+    try:
+        yield cast(BinaryIO, fh)
+    finally:
+        fh.detach()
+
+
+@contextmanager
+def path_reader(path: PathLike) -> Generator[BinaryIO, None, None]:
+    """Open a file for reading binary content, or use stdin. Compressed files
+    are decompressed based on their suffix; the compression of stdin is
+    detected from its first bytes."""
+    if str(path) == "-":
+        with _stdio_buffer(sys.stdin.buffer, READ_BUFFER) as fh:
+            compression = detect_compression(_peek(fh, MAGIC_SIZE))
+            if compression is None:
+                yield fh
+                return
+            with compressed_reader(fh, compression) as reader:
+                yield reader
+        return
+    with open_compressed(path, "rb") as fh:
+        yield fh
+
+
+def path_lines(
+    path: PathLike, max_line: int = MAX_LINE
+) -> Generator[bytes, None, None]:
+    """Read the raw lines of an entity stream, without parsing them. Binary
+    entity streams are converted to JSON lines."""
+    with path_reader(path) as fh:
+        yield from binary_lines(fh, max_line=max_line)
 
 
 def path_entities(
@@ -87,25 +354,44 @@ def path_entities(
     entity_type: Type[E],
     cleaned: bool = True,
     max_line: int = MAX_LINE,
+    trusted: Optional[bool] = None,
 ) -> Generator[E, None, None]:
-    if str(path) == "-":
-        fh = click.get_binary_stream("stdin")
-        yield from binary_entities(fh, entity_type, cleaned=cleaned, max_line=max_line)
-        return
-    with open(path, "rb") as fh:
-        yield from binary_entities(fh, entity_type, cleaned=cleaned, max_line=max_line)
+    """Read a stream of entities from a file, or stdin. By default, the input is
+    trusted if the ``--trusted`` option is given to the ``ftm`` command."""
+    if trusted is None:
+        trusted = _trusted_input()
+    with path_reader(path) as fh:
+        yield from binary_entities(
+            fh, entity_type, cleaned=cleaned, max_line=max_line, trusted=trusted
+        )
 
 
 @contextmanager
 def path_writer(path: PathLike) -> Generator[BinaryIO, None, None]:
-    """Open a file for writing binary content, or use stdout."""
+    """Open a file for writing binary content, or use stdout. Files are
+    compressed based on their suffix, e.g. ``.gz`` or ``.zst``."""
     if str(path) == "-":
-        yield click.get_binary_stream("stdout")
+        with _stdio_buffer(sys.stdout.buffer, WRITE_BUFFER, write=True) as fh:
+            yield fh
         return
-    with open(path, "wb") as fh:
+    with open_compressed(path, "wb") as fh:
         yield fh
 
 
+@contextmanager
+def path_entity_writer(
+    path: PathLike, format: Optional[str] = None
+) -> Generator[EntityWriter, None, None]:
+    """Open an :class:`EntityWriter` for a file, or stdout. See
+    :func:`make_entity_writer` for the choice of ``format``."""
+    with path_writer(path) as fh:
+        writer = make_entity_writer(fh, format=format)
+        try:
+            yield writer
+        finally:
+            writer.flush()
+
+
 def export_stream(exporter: Exporter, path: Path) -> None:
     try:
         for entity in path_entities(path, EntityProxy):
@@ -0,0 +1,300 @@
+"""
+A memory-efficient variant of :class:`~followthemoney.proxy.EntityProxy`.
+
+The default proxy keeps its values in a dictionary of lists, which carries
+several hundred bytes of container overhead per entity before any actual data
+is stored. When millions of entities need to be held in memory at once (e.g.
+while aggregating fragments), :class:`CompactEntityProxy` can be used instead.
+It stores all values of the entity in one flat tuple, next to a parallel tuple
+of interned property name indexes. Values of the same property are kept
+adjacent, so iteration order matches that of the default proxy.
+
+Values which are added are collected in a mutable buffer, which is packed
+into the value tuples when the entity is next read. Adding many values is
+therefore linear, but alternating reads and writes are more expensive than
+with the default proxy.
+"""
+
+from itertools import repeat
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from followthemoney.property import Property
+from followthemoney.proxy import P, EntityProxy
+from followthemoney.types.common import PropertyType
+from followthemoney.exc import InvalidData
+from followthemoney.util import merge_context
+
+if TYPE_CHECKING:
+    from followthemoney.model import Model
+
+C = TypeVar("C", bound="CompactEntityProxy")
+
+_NAMES: List[str] = []
+_INDEXES: Dict[str, int] = {}
+
+
+def _intern(name: str) -> int:
+    """Get a small integer to represent the given property name."""
+    index = _INDEXES.get(name)
+    if index is None:
+        index = len(_NAMES)
+        _NAMES.append(name)
+        _INDEXES[name] = index
+    return index
+
+
+class CompactEntityProxy(EntityProxy):
+    """An entity proxy which stores its property values as a flat tuple rather
+    than a dictionary of lists. It offers the same API as
+    :class:`~followthemoney.proxy.EntityProxy`, trading write performance for
+    a much smaller memory footprint.
+
+    Use :meth:`followthemoney.model.Model.get_proxy` or
+    :meth:`followthemoney.model.Model.make_entity` with ``compact=True`` to
+    create instances."""
+
+    __slots__ = ["_keys", "_values", "_pending"]
+
+    def __init__(
+        self,
+        model: "Model",
+        data: Dict[str, Any],
+        key_prefix: Optional[str] = None,
+        cleaned: bool = True,
+        trusted: bool = False,
+    ):
+        self._keys: Tuple[int, ...] = ()
+        self._values: Tuple[str, ...] = ()
+        self._pending: Optional[Dict[int, Dict[str, None]]] = None
+        super().__init__(
+            model, data, key_prefix=key_prefix, cleaned=cleaned, trusted=trusted
+        )
+
+        # The base class fills the property dictionary directly for cleaned
+        # data. Pack it into the flat representation and release it.
+        if self._pending is None:
+            keys: List[int] = []
+            values: List[str] = []
+            for name, prop_values in self._properties.items():
+                keys.extend(repeat(_intern(name), len(prop_values)))
+                values.extend(prop_values)
+            self._keys = tuple(keys)
+            self._values = tuple(values)
+        else:
+            pending = self._pending
+            for name, prop_values in self._properties.items():
+                group = pending.setdefault(_intern(name), {})
+                for value in prop_values:
+                    group[value] = None
+            self._freeze()
+        del self._properties
+
+    def _thaw(self) -> Dict[int, Dict[str, None]]:
+        """Unpack the values into a buffer of (ordered, de-duplicated) values
+        for each property, so that a series of adds runs in linear time."""
+        if self._pending is None:
+            pending: Dict[int, Dict[str, None]] = {}
+            for index, value in zip(self._keys, self._values):
+                pending.setdefault(index, {})[value] = None
+            self._pending = pending
+        return self._pending
+
+    def _freeze(self) -> None:
+        """Pack the buffer of added values into the value tuples."""
+        pending = self._pending
+        if pending is None:
+            return
+        keys: List[int] = []
+        values: List[str] = []
+        for index, group in pending.items():
+            keys.extend(repeat(index, len(group)))
+            values.extend(group)
+        self._keys = tuple(keys)
+        self._values = tuple(values)
+        self._pending = None
+
+    def _group(self, index: int) -> Tuple[int, int]:
+        """Get the slice of the value tuple which holds the given property."""
+        self._freeze()
+        try:
+            start = self._keys.index(index)
+        except ValueError:
+            return (len(self._keys), len(self._keys))
+        end = start
+        keys = self._keys
+        while end < len(keys) and keys[end] == index:
+            end += 1
+        return (start, end)
+
+    def _drop(self, start: int, end: int) -> None:
+        self._keys = self._keys[:start] + self._keys[end:]
+        self._values = self._values[:start] + self._values[end:]
+
+    def get(self, prop: P, quiet: bool = False) -> List[str]:
+        prop_name = self._prop_name(prop, quiet=quiet)
+        if prop_name is None or prop_name not in _INDEXES:
+            return []
+        start, end = self._group(_INDEXES[prop_name])
+        return list(self._values[start:end])
+
+    def has(self, prop: P, quiet: bool = False) -> bool:
+        prop_name = self._prop_name(prop, quiet=quiet)
+        if prop_name is None or prop_name not in _INDEXES:
+            return False
+        self._freeze()
+        return _INDEXES[prop_name] in self._keys
+
+    def unsafe_add(
+        self,
+        prop: Property,
+        value: Optional[str],
+        cleaned: bool = False,
+        fuzzy: bool = False,
+        format: Optional[str] = None,
+    ) -> Optional[str]:
+        if not cleaned and value is not None:
+            format = format or prop.format
+            type_ = prop.type
+            if type_.cache_size > 0:
+                value = type_.clean(value, fuzzy=fuzzy, format=format, proxy=self)
+            else:
+                value = type_.clean_text(value, fuzzy=fuzzy, format=format, proxy=self)
+
+        if value is None:
+            return None
+
+        value_size = len(value)
+        if prop.type.total_size is not None:
+            if self._size + value_size > prop.type.total_size:
+                return None
+        self._size += value_size
+
+        group = self._thaw().setdefault(_intern(prop.name), {})
+        group[value] = None
+        return value
+
+    def set(
+        self,
+        prop: P,
+        values: Any,
+        cleaned: bool = False,
+        quiet: bool = False,
+        fuzzy: bool = False,
+        format: Optional[str] = None,
+    ) -> None:
+        prop_name = self._prop_name(prop, quiet=quiet)
+        if prop_name is None:
+            return
+        self.pop(prop_name)
+        return self.add(
+            prop, values, cleaned=cleaned, quiet=quiet, fuzzy=fuzzy, format=format
+        )
+
+    def pop(self, prop: P, quiet: bool = True) -> List[str]:
+        prop_name = self._prop_name(prop, quiet=quiet)
+        if prop_name is None or prop_name not in _INDEXES:
+            return []
+        start, end = self._group(_INDEXES[prop_name])
+        values = list(self._values[start:end])
+        self._drop(start, end)
+        return values
+
+    def remove(self, prop: P, value: str, quiet: bool = True) -> None:
+        prop_name = self._prop_name(prop, quiet=quiet)
+        if prop_name is None or prop_name not in _INDEXES:
+            return
+        start, end = self._group(_INDEXES[prop_name])
+        for pos in range(start, end):
+            if self._values[pos] == value:
+                self._drop(pos, pos + 1)
+                return
+
+    def iterprops(self) -> List[Property]:
+        self._freeze()
+        props: List[Property] = []
+        last: Optional[int] = None
+        for index in self._keys:
+            if index != last:
+                props.append(self.schema.properties[_NAMES[index]])
+                last = index
+        return props
+
+    def itervalues(self) -> Generator[Tuple[Property, str], None, None]:
+        self._freeze()
+        props = self.schema.properties
+        for index, value in zip(self._keys, self._values):
+            yield (props[_NAMES[index]], value)
+
+    def get_type_values(
+        self, type_: PropertyType, matchable: bool = False
+    ) -> List[str]:
+        combined: Set[str] = set()
+        for prop, value in self.itervalues():
+            if matchable and not prop.matchable:
+                continue
+            if prop.type == type_:
+                combined.add(value)
+        return list(combined)
+
+    @property
+    def properties(self) -> Dict[str, List[str]]:
+        self._freeze()
+        data: Dict[str, List[str]] = {}
+        for index, value in zip(self._keys, self._values):
+            data.setdefault(_NAMES[index], []).append(value)
+        return data
+
+    def merge(self: C, other: EntityProxy) -> C:
+        """Merge another entity proxy into this one. The other proxy can be
+        either a compact or a regular entity proxy."""
+        model = self.schema.model
+        self.id = self.id or other.id
+        try:
+            self.schema = model.common_schema(self.schema, other.schema)
+        except InvalidData as e:
+            msg = "Cannot merge entities with id %s: %s"
+            raise InvalidData(msg % (self.id, e))
+
+        self.context = merge_context(self.context, other.context)
+        for prop, value in other.itervalues():
+            self.unsafe_add(prop, value, cleaned=True)
+        # Merged entities are usually held in memory, so pack them right away:
+        self._freeze()
+        return self
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Property name indexes are interned per process, so the values are
+        # pickled by property name:
+        return {
+            "schema": self.schema,
+            "id": self.id,
+            "key_prefix": self.key_prefix,
+            "context": self.context,
+            "size": self._size,
+            "properties": self.properties,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.schema = state["schema"]
+        self.id = state["id"]
+        self.key_prefix = state["key_prefix"]
+        self.context = state["context"]
+        self._size = state["size"]
+        self._pending = None
+        keys: List[int] = []
+        values: List[str] = []
+        for name, prop_values in state["properties"].items():
+            keys.extend(repeat(_intern(name), len(prop_values)))
+            values.extend(prop_values)
+        self._keys = tuple(keys)
+        self._values = tuple(values)
@@ -1,6 +1,6 @@
 import math
 import itertools
-from typing import Dict, Generator, Iterable, List, Optional
+from typing import Dict, Generator, Iterable, List, Optional, Set, Union
 import fingerprints
 from normality import normalize
 from followthemoney.exc import InvalidData
@@ -27,24 +27,81 @@ COMPARE_WEIGHTS: Weights = {
 }
 
 
-def compare_scores(model: Model, left: EntityProxy, right: EntityProxy) -> Scores:
+MAX_NAMES = 200
+
+
+class ComparisonFeatures(object):
+    """The parts of an entity which are used in a comparison, computed once so
+    that they can be re-used when comparing the entity to many others (see
+    :func:`compare_many`). Each feature is only computed when a comparison
+    first needs it."""
+
+    __slots__ = ["proxy", "max_names", "_inverted", "_names", "_countries"]
+
+    def __init__(self, proxy: EntityProxy, max_names: int = MAX_NAMES) -> None:
+        self.proxy = proxy
+        self.max_names = max_names
+        self._inverted: Optional[Dict[str, List[str]]] = None
+        self._names: Optional[List[str]] = None
+        self._countries: Optional[Set[str]] = None
+
+    @property
+    def inverted(self) -> Dict[str, List[str]]:
+        """The matchable values of the entity, grouped by their type."""
+        if self._inverted is None:
+            self._inverted = self.proxy.get_type_inverted(matchable=True)
+        return self._inverted
+
+    @property
+    def names(self) -> List[str]:
+        """Normalised names and name fingerprints of the entity."""
+        if self._names is None:
+            names = _normalize_names(self.proxy.names)
+            self._names = list(itertools.islice(names, self.max_names))
+        return self._names
+
+    @property
+    def countries(self) -> Set[str]:
+        """Countries linked to the entity, including those implied by other
+        values (e.g. phone numbers)."""
+        if self._countries is None:
+            self._countries = self.proxy.country_hints
+        return self._countries
+
+
+Comparable = Union[EntityProxy, ComparisonFeatures]
+
+
+def _features(entity: Comparable) -> ComparisonFeatures:
+    if isinstance(entity, ComparisonFeatures):
+        return entity
+    return ComparisonFeatures(entity)
+
+
+def compare_scores(model: Model, left: Comparable, right: Comparable) -> Scores:
     """Compare two entities and return a match score for each property."""
+    return _compare_features(model, _features(left), _features(right))
+
+
+def _compare_features(
+    model: Model, left: ComparisonFeatures, right: ComparisonFeatures
+) -> Scores:
     try:
-        model.common_schema(left.schema, right.schema)
+        model.common_schema(left.proxy.schema, right.proxy.schema)
     except InvalidData:
         return {}
     scores: Scores = {}
-    left_inv = left.get_type_inverted(matchable=True)
-    right_inv = right.get_type_inverted(matchable=True)
+    left_inv = left.inverted
+    right_inv = right.inverted
     left_groups = set(left_inv.keys())
     right_groups = set(right_inv.keys())
     for group_name in left_groups.intersection(right_groups):
         group = registry.groups[group_name]
         try:
             if group == registry.name:
-                score = compare_names(left, right)
+                score = _compare_name_lists(left.names, right.names)
             elif group == registry.country:
-                score = compare_countries(left, right)
+                score = _compare_country_sets(left.countries, right.countries)
             else:
                 score = compare_group(
                     group, left_inv[group_name], right_inv[group_name]
@@ -72,8 +129,8 @@ def _compare(scores: Scores, weights: Weights, n_std: int = 1) -> float:
 
 def compare(
     model: Model,
-    left: EntityProxy,
-    right: EntityProxy,
+    left: Comparable,
+    right: Comparable,
     weights: Weights = COMPARE_WEIGHTS,
 ) -> float:
     """Compare two entities and return a match score."""
@@ -81,6 +138,26 @@ def compare(
     return _compare(scores, weights)
 
 
+def compare_many(
+    model: Model,
+    query: Comparable,
+    candidates: Iterable[Comparable],
+    weights: Weights = COMPARE_WEIGHTS,
+) -> List[float]:
+    """Compare one entity to a set of candidates and return a list of match
+    scores in the order of the candidates. The comparison features of the
+    query entity are only computed once. Candidates can be given as
+    :class:`ComparisonFeatures` to re-use them across queries."""
+    query_features = _features(query)
+    scores: List[float] = []
+    for candidate in candidates:
+        candidate_scores = _compare_features(
+            model, query_features, _features(candidate)
+        )
+        scores.append(_compare(candidate_scores, weights))
+    return scores
+
+
 def _normalize_names(names: Iterable[str]) -> Generator[str, None, None]:
     """Generate a sequence of comparable names for an entity. This also
     generates a `fingerprint`, i.e. a version of the name where all tokens
@@ -109,11 +186,17 @@ def compare_group(
 
 
 def compare_names(
-    left: EntityProxy, right: EntityProxy, max_names: int = 200
+    left: EntityProxy, right: EntityProxy, max_names: int = MAX_NAMES
 ) -> Optional[float]:
-    result = 0.0
     left_list = list(itertools.islice(_normalize_names(left.names), max_names))
     right_list = list(itertools.islice(_normalize_names(right.names), max_names))
+    return _compare_name_lists(left_list, right_list, max_names=max_names)
+
+
+def _compare_name_lists(
+    left_list: List[str], right_list: List[str], max_names: int = MAX_NAMES
+) -> Optional[float]:
+    result = 0.0
     if not left_list and not right_list:
         raise ValueError("At least one proxy must have name properties")
     elif not left_list or not right_list:
@@ -130,8 +213,12 @@ def compare_names(
 
 
 def compare_countries(left: EntityProxy, right: EntityProxy) -> Optional[float]:
-    left_countries = left.country_hints
-    right_countries = right.country_hints
+    return _compare_country_sets(left.country_hints, right.country_hints)
+
+
+def _compare_country_sets(
+    left_countries: Set[str], right_countries: Set[str]
+) -> Optional[float]:
     if not left_countries and not right_countries:
         raise ValueError("At least one proxy must have country properties")
     elif not left_countries or not right_countries:
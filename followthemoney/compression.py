@@ -0,0 +1,113 @@
+"""
+Transparent compression for entity streams and exported files. Files are
+compressed based on their suffix (``.gz``, ``.bz2``, ``.xz`` or ``.zst``); the
+compression of an input stream can also be detected from its first bytes.
+
+Zstandard compression requires the ``zstandard`` package, and uses all of the
+available CPU cores.
+"""
+
+try:
+    import zstandard  # type: ignore[import-not-found, unused-ignore]
+except ImportError:
+    zstandard = None  # type: ignore[assignment, unused-ignore]
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import Any, BinaryIO, Literal, Optional, cast
+
+from followthemoney.util import MEGABYTE, PathLike
+
+COMPRESSIONS = ("gzip", "bz2", "xz", "zstd")
+SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+# Compressed data is (de-)compressed in large blocks, so that the compressors
+# are not called for every line of a file:
+BUFFER_SIZE = 4 * MEGABYTE
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+Mode = Literal["rb", "wb"]
+
+
+def path_compression(path: PathLike) -> Optional[str]:
+    """Get the compression of a file based on its suffix."""
+    suffix = Path(path).suffix.lower()
+    for compression, compression_suffix in SUFFIXES.items():
+        if suffix == compression_suffix:
+            return compression
+    return None
+
+
+def detect_compression(header: bytes) -> Optional[str]:
+    """Get the compression of a stream based on its first bytes."""
+    for compression, magic in MAGIC.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def check_compression(compression: str) -> None:
+    """Make sure that the given compression is known and available."""
+    if compression not in COMPRESSIONS:
+        raise ValueError("Invalid compression: %r" % compression)
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("Zstandard compression requires zstandard to be installed.")
+
+
+def _stream(file: Any, mode: Mode, compression: str) -> Any:
+    # If a file handle is given, it is not closed along with the stream.
+    is_path = isinstance(file, (str, os.PathLike))
+    if compression == "gzip":
+        if is_path:
+            return gzip.GzipFile(
+                filename=file, mode=mode, compresslevel=GZIP_LEVEL, mtime=0
+            )
+        return gzip.GzipFile(fileobj=file, mode=mode, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == "bz2":
+        return bz2.BZ2File(file, mode=mode)
+    if compression == "xz":
+        return lzma.LZMAFile(file, mode=mode)
+    fh = open(file, mode) if is_path else file
+    if mode == "rb":
+        dctx = zstandard.ZstdDecompressor()
+        return dctx.stream_reader(fh, read_size=BUFFER_SIZE, closefd=is_path)
+    cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+    # The writer must report the number of uncompressed bytes it consumed, as
+    # expected by io.BufferedWriter:
+    return cctx.stream_writer(fh, closefd=is_path, write_return_read=True)
+
+
+def open_compressed(
+    path: PathLike, mode: Mode = "rb", compression: Optional[str] = None
+) -> BinaryIO:
+    """Open a file for reading (``rb``) or writing (``wb``) binary data. The
+    compression is chosen based on the suffix of the file name, unless it is
+    given explicitly. Files without compression are opened as usual."""
+    if mode not in ("rb", "wb"):
+        raise ValueError("Invalid mode: %r" % mode)
+    if compression is None:
+        compression = path_compression(path)
+    if compression is None:
+        return open(path, mode, buffering=BUFFER_SIZE)
+    check_compression(compression)
+    stream = _stream(path, mode, compression)
+    if mode == "rb":
+        return cast(BinaryIO, io.BufferedReader(stream, buffer_size=BUFFER_SIZE))
+    return cast(BinaryIO, io.BufferedWriter(stream, buffer_size=BUFFER_SIZE))
+
+
+def compressed_reader(fh: BinaryIO, compression: str) -> BinaryIO:
+    """Decompress the data read from a binary file handle, e.g. stdin. Closing
+    the result does not close the file handle."""
+    check_compression(compression)
+    stream = _stream(fh, "rb", compression)
+    return cast(BinaryIO, io.BufferedReader(stream, buffer_size=BUFFER_SIZE))
@@ -1,9 +1,15 @@
-from typing import Generator, List, Optional, Tuple
+import os
+import sqlite3
+import tempfile
+from typing import Generator, List, Optional, Set, Tuple
 from followthemoney.property import Property
 from followthemoney.proxy import E
 from followthemoney.schema import Schema
 from followthemoney.types import registry
 
+# Approximate memory used by a string in a set in addition to its content.
+SET_ENTRY_OVERHEAD = 100
+
 
 class Exporter(object):
     def __init__(self, export_all: bool = False) -> None:
@@ -27,3 +33,69 @@ class Exporter(object):
 
     def finalize(self) -> None:
         pass
+
+
+class SpillSet(object):
+    """A set of strings with bounded memory use, e.g. to remember the nodes
+    which have already been exported. Once the estimated size of the set
+    exceeds ``memory_limit`` (in bytes), its entries are moved to a temporary
+    SQLite database on disk, which is then also used to check membership.
+    Without a ``memory_limit``, all entries are kept in memory."""
+
+    def __init__(self, memory_limit: Optional[int] = None) -> None:
+        self.memory_limit = memory_limit
+        self.buffer: Set[str] = set()
+        self.buffer_size = 0
+        self.path: Optional[str] = None
+        self.db: Optional[sqlite3.Connection] = None
+
+    def add(self, value: str) -> None:
+        if value in self:
+            return
+        self.buffer.add(value)
+        self.buffer_size += len(value) + SET_ENTRY_OVERHEAD
+        if self.memory_limit is not None and self.buffer_size > self.memory_limit:
+            self.spill()
+
+    def spill(self) -> None:
+        """Move the entries kept in memory to the database on disk."""
+        if self.db is None:
+            fd, self.path = tempfile.mkstemp(prefix="ftm-set-", suffix=".sqlite3")
+            os.close(fd)
+            self.db = sqlite3.connect(self.path)
+            self.db.execute("PRAGMA journal_mode = OFF")
+            self.db.execute("PRAGMA synchronous = OFF")
+            self.db.execute(
+                "CREATE TABLE entries (value TEXT PRIMARY KEY) WITHOUT ROWID"
+            )
+        # Inserting the entries in order keeps the writes to the B-tree local:
+        values = ((v,) for v in sorted(self.buffer))
+        with self.db:
+            self.db.executemany("INSERT INTO entries VALUES (?)", values)
+        self.buffer = set()
+        self.buffer_size = 0
+
+    def __contains__(self, value: object) -> bool:
+        if value in self.buffer:
+            return True
+        if self.db is None or not isinstance(value, str):
+            return False
+        query = "SELECT 1 FROM entries WHERE value = ?"
+        return self.db.execute(query, (value,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        count = len(self.buffer)
+        if self.db is not None:
+            count += self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return count
+
+    def close(self) -> None:
+        """Remove the database on disk, if any."""
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+        if self.path is not None:
+            os.unlink(self.path)
+            self.path = None
+        self.buffer = set()
+        self.buffer_size = 0
@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 from followthemoney.proxy import E
+from followthemoney.compression import SUFFIXES, check_compression, open_compressed
 from followthemoney.export.common import Exporter
 from followthemoney.schema import Schema
 from followthemoney.util import PathLike
@@ -23,15 +24,28 @@ class CSVMixin(object):
         self,
         directory: PathLike,
         extra: Optional[List[str]] = None,
+        compression: Optional[str] = None,
     ) -> None:
+        if compression is not None:
+            check_compression(compression)
         self.directory = Path(directory)
         self.extra = extra or []
+        self.compression = compression
         self.handles: Dict[Schema, Tuple[TextIOWrapper, CSVWriter]] = {}
 
+    def _csv_file_name(self, name: str) -> str:
+        if self.compression is None:
+            return "{0}.csv".format(name)
+        return "{0}.csv{1}".format(name, SUFFIXES[self.compression])
+
     def _open_csv_file(self, name: str) -> Tuple[TextIOWrapper, CSVWriter]:
         self.directory.mkdir(parents=True, exist_ok=True)
-        file_path = self.directory.joinpath("{0}.csv".format(name))
-        handle = open(file_path, mode="w")
+        file_path = self.directory.joinpath(self._csv_file_name(name))
+        if self.compression is None:
+            handle = open(file_path, mode="w")
+        else:
+            fh = open_compressed(file_path, "wb", compression=self.compression)
+            handle = TextIOWrapper(fh)
         writer = csv.writer(handle, dialect=csv.unix_dialect)
         return handle, writer
 
@@ -52,14 +66,19 @@ class CSVMixin(object):
 
 
 class CSVExporter(Exporter, CSVMixin):
+    """Write entities to a directory with one CSV file for each schema. If a
+    ``compression`` (e.g. ``gzip`` or ``zstd``) is given, the files are
+    compressed and named accordingly, e.g. ``Person.csv.gz``."""
+
     def __init__(
         self,
         directory: PathLike,
         export_all: bool = True,
         extra: Optional[List[str]] = None,
+        compression: Optional[str] = None,
     ) -> None:
         Exporter.__init__(self, export_all=export_all)
-        self._configure(directory, extra=extra)
+        self._configure(directory, extra=extra, compression=compression)
 
     def _write_header(self, writer: CSVWriter, schema: Schema) -> None:
         headers = ["id"]
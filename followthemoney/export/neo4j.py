@@ -1,8 +1,9 @@
 import os
 import json
 import logging
-from typing import Any, Dict, Iterable, List, Optional, Set, TextIO
+from typing import Any, Dict, Iterable, List, Optional, TextIO
 
+from followthemoney.export.common import SpillSet
 from followthemoney.export.csv import CSVMixin, CSVWriter
 from followthemoney.export.graph import GraphExporter, DEFAULT_EDGE_TYPES
 from followthemoney.graph import Edge, Node
@@ -12,24 +13,35 @@ from followthemoney.util import PathLike, const_case
 log = logging.getLogger(__name__)
 NEO4J_ADMIN_PATH = os.environ.get("NEO4J_ADMIN_PATH", "neo4j-admin")
 NEO4J_DATABASE_NAME = os.environ.get("NEO4J_DATABASE_NAME", "graph.db")
+# The compressions which neo4j-admin can import (besides zip archives):
+NEO4J_COMPRESSIONS = ("gzip",)
 
 
 class Neo4JCSVExporter(CSVMixin, GraphExporter):
+    """Write a set of CSV files and a script to load them into Neo4J using
+    ``neo4j-admin import``. The IDs of the value nodes which have been written
+    are kept in memory, up to ``memory_limit`` bytes, and in a temporary file
+    beyond that (see :class:`~followthemoney.export.common.SpillSet`)."""
+
     def __init__(
         self,
         directory: PathLike,
         extra: Optional[List[str]] = None,
         edge_types: Iterable[str] = DEFAULT_EDGE_TYPES,
+        compression: Optional[str] = None,
+        memory_limit: Optional[int] = None,
     ) -> None:
+        if compression is not None and compression not in NEO4J_COMPRESSIONS:
+            raise ValueError("Neo4J cannot import %s-compressed files" % compression)
         super(Neo4JCSVExporter, self).__init__(edge_types=edge_types)
-        self._configure(directory, extra=extra)
+        self._configure(directory, extra=extra, compression=compression)
 
         self.links_handler, self.links_writer = self._open_csv_file("_links")
         self.links_writer.writerow([":TYPE", ":START_ID", ":END_ID", "weight"])
 
         self.nodes_handler, self.nodes_writer = self._open_csv_file("_nodes")
         self.nodes_writer.writerow(["id:ID", ":LABEL", "caption"])
-        self.nodes_seen: Set[str] = set()
+        self.nodes_seen = SpillSet(memory_limit=memory_limit)
 
     def _write_header(self, writer: CSVWriter, schema: Schema) -> None:
         headers = []
@@ -94,12 +106,12 @@ class Neo4JCSVExporter(CSVMixin, GraphExporter):
             fp.write(cmd.format(NEO4J_ADMIN_PATH, NEO4J_DATABASE_NAME))
             fp.write("\t--multiline-fields=true \\\n")
             cmd = "\t--relationships={} \\\n"
-            fp.write(cmd.format(os.path.basename(self.links_handler.name)))
+            fp.write(cmd.format(self._csv_file_name("_links")))
             cmd = "\t--nodes={} \\\n"
-            fp.write(cmd.format(os.path.basename(self.nodes_handler.name)))
+            fp.write(cmd.format(self._csv_file_name("_nodes")))
 
-            for schema, (handle, writer) in self.handles.items():
-                file_name = os.path.basename(handle.name)
+            for schema in self.handles.keys():
+                file_name = self._csv_file_name(schema.name)
                 if schema.edge:
                     cmd = "\t--relationships={} \\\n"
                     fp.write(cmd.format(file_name))
@@ -109,21 +121,29 @@ class Neo4JCSVExporter(CSVMixin, GraphExporter):
 
         self.links_handler.close()
         self.nodes_handler.close()
+        self.nodes_seen.close()
         self.close()
 
 
 class CypherGraphExporter(GraphExporter):
     """Cypher query format, used for import to Neo4J. This is a bit like
     writing SQL with individual statements - so for large datasets it
-    might be a better idea to do a CSV-based import."""
+    might be a better idea to do a CSV-based import. The entity nodes which
+    have been written are remembered using bounded memory if a ``memory_limit``
+    is given, as in :class:`Neo4JCSVExporter`."""
 
     # https://www.opencypher.org/
     # MATCH (n) DETACH DELETE n;
 
-    def __init__(self, fh: TextIO, edge_types: Iterable[str] = DEFAULT_EDGE_TYPES):
+    def __init__(
+        self,
+        fh: TextIO,
+        edge_types: Iterable[str] = DEFAULT_EDGE_TYPES,
+        memory_limit: Optional[int] = None,
+    ):
         super(CypherGraphExporter, self).__init__(edge_types=edge_types)
         self.fh = fh
-        self.proxy_nodes: Set[str] = set()
+        self.proxy_nodes = SpillSet(memory_limit=memory_limit)
 
     def _to_map(self, data: Dict[str, Any]) -> str:
         values = []
@@ -179,3 +199,6 @@ class CypherGraphExporter(GraphExporter):
             )
 
         self.graph.flush()
+
+    def finalize_graph(self) -> None:
+        self.proxy_nodes.close()
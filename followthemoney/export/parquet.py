@@ -0,0 +1,112 @@
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:
+    pa = None
+    pq = None
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from followthemoney.proxy import E
+from followthemoney.export.common import Exporter
+from followthemoney.property import Property
+from followthemoney.schema import Schema
+from followthemoney.util import PathLike
+
+BATCH_SIZE = 10000
+
+
+class ParquetTable(object):
+    """The columns of entities of one schema, which are buffered until they are
+    written to the Parquet file as a row group."""
+
+    def __init__(
+        self, path: Path, properties: List[Property], extra: List[str]
+    ) -> None:
+        self.properties = properties
+        self.extra = extra
+        fields = [pa.field("id", pa.string(), nullable=False)]
+        for name in extra:
+            fields.append(pa.field(name, pa.string()))
+        for prop in properties:
+            # Not using label to make it more machine-readable:
+            fields.append(pa.field(prop.name, pa.list_(pa.string())))
+        names = set()
+        for field in fields:
+            if field.name in names:
+                raise ValueError("Duplicate Parquet column: %s" % field.name)
+            names.add(field.name)
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(str(path), self.schema)
+        self.columns: Dict[str, List[Any]] = {f.name: [] for f in fields}
+        self.size = 0
+
+    def add(self, values: List[Any]) -> None:
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+        self.size += 1
+
+    def flush(self) -> None:
+        if self.size == 0:
+            return
+        table = pa.Table.from_pydict(self.columns, schema=self.schema)
+        self.writer.write_table(table)
+        for column in self.columns.values():
+            column.clear()
+        self.size = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+class ParquetExporter(Exporter):
+    """Write entities to a directory with one Parquet file for each schema. The
+    values of each property are stored in a list column, rather than joined into
+    a single string as in the CSV export. Entities are buffered and written in
+    row groups of ``batch_size`` entities, so that memory use stays bounded.
+    The ``extra`` columns must not be named like the ``id`` column or any of
+    the exported properties.
+
+    This requires ``pyarrow`` to be installed (``followthemoney[parquet]``)."""
+
+    def __init__(
+        self,
+        directory: PathLike,
+        export_all: bool = True,
+        extra: Optional[List[str]] = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> None:
+        if pa is None:
+            raise ImportError("Parquet export requires pyarrow to be installed.")
+        super(ParquetExporter, self).__init__(export_all=export_all)
+        self.directory = Path(directory)
+        self.extra = extra or []
+        self.batch_size = batch_size
+        self.tables: Dict[Schema, ParquetTable] = {}
+
+    def _get_table(self, schema: Schema) -> ParquetTable:
+        table = self.tables.get(schema)
+        if table is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory.joinpath("{0}.parquet".format(schema.name))
+            properties = list(self.exportable_properties(schema))
+            table = ParquetTable(path, properties, self.extra)
+            self.tables[schema] = table
+        return table
+
+    def write(self, proxy: E, extra: Optional[List[str]] = None) -> None:
+        table = self._get_table(proxy.schema)
+        row: List[Any] = [proxy.id]
+        extra = extra or []
+        row.extend(extra[i] if i < len(extra) else None for i in range(len(self.extra)))
+        for prop in table.properties:
+            row.append(proxy.get(prop) or None)
+        table.add(row)
+        if table.size >= self.batch_size:
+            table.flush()
+
+    def finalize(self) -> None:
+        for table in self.tables.values():
+            table.close()
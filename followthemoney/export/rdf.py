@@ -3,18 +3,72 @@ from rdflib import Graph
 from typing import List, Optional, TextIO
 
 from followthemoney.export.common import Exporter
-from followthemoney.proxy import E
+from followthemoney.proxy import E, Triple
+from followthemoney.rdf import Identifier, Literal, URIRef
 
 log = logging.getLogger(__name__)
 
+# Characters which rdflib refuses to serialise in a URI reference.
+INVALID_URI_CHARS = '<>" {}|\\^`'
+
+
+def _nt_uri(uri: str) -> str:
+    for char in INVALID_URI_CHARS:
+        if char in uri:
+            raise ValueError("Invalid URI for serialisation: %r" % uri)
+    return f"<{uri}>"
+
+
+def _nt_literal(literal: Literal) -> str:
+    encoded = str(literal)
+    encoded = encoded.replace("\\", "\\\\").replace("\n", "\\n")
+    encoded = encoded.replace('"', '\\"').replace("\r", "\\r")
+    if literal.language:
+        return f'"{encoded}"@{literal.language}'
+    if literal.datatype:
+        return f'"{encoded}"^^<{literal.datatype}>'
+    return f'"{encoded}"'
+
+
+def _nt_term(term: Identifier) -> str:
+    if isinstance(term, Literal):
+        return _nt_literal(term)
+    if isinstance(term, URIRef):
+        return _nt_uri(term)
+    raise ValueError("Cannot serialise RDF term: %r" % term)
+
+
+def nt_row(triple: Triple) -> str:
+    """Serialise a single triple as a line of (RDF 1.1) N-Triples."""
+    subject, predicate, obj = triple
+    return f"{_nt_term(subject)} {_nt_term(predicate)} {_nt_term(obj)} .\n"
+
 
 class RDFExporter(Exporter):
-    def __init__(self, fh: TextIO, qualified: bool = True) -> None:
+    """Write entities as N-Triples. By default, the triples of each entity are
+    serialised directly to the file handle. Set ``use_rdflib`` to serialise each
+    entity via an rdflib graph instead, which is much slower."""
+
+    def __init__(
+        self, fh: TextIO, qualified: bool = True, use_rdflib: bool = False
+    ) -> None:
         super(RDFExporter, self).__init__()
         self.fh = fh
         self.qualified = qualified
+        self.use_rdflib = use_rdflib
 
     def write(self, proxy: E, extra: Optional[List[str]] = None) -> None:
+        if self.use_rdflib:
+            return self._write_graph(proxy)
+        try:
+            # Some triples are generated twice (e.g. the caption), so they
+            # are de-duplicated like they would be in a graph.
+            rows = {nt_row(t): None for t in proxy.triples(qualified=self.qualified)}
+            self.fh.write("".join(rows))
+        except Exception:
+            log.exception("Failed to serialize ntriples.")
+
+    def _write_graph(self, proxy: E) -> None:
         graph = Graph()
 
         for triple in proxy.triples(qualified=self.qualified):
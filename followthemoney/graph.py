@@ -205,6 +205,10 @@ class Graph(object):
         self.edges: Dict[str, Edge] = {}
         self.nodes: Dict[str, Node] = {}
         self.proxies: Dict[str, Optional[EntityProxy]] = {}
+        # Adjacency indexes, mapping node IDs to the edges (by ID) which
+        # originate from or point at them.
+        self._outbound: Dict[str, Dict[str, Edge]] = {}
+        self._inbound: Dict[str, Dict[str, Edge]] = {}
 
     def queue(self, id_: str, proxy: Optional[EntityProxy] = None) -> None:
         """Register a reference to an entity in the graph."""
@@ -229,6 +233,13 @@ class Graph(object):
             self.nodes[node.id] = node
         return self.nodes[node.id]
 
+    def _index_edge(self, edge: Edge) -> None:
+        self.edges[edge.id] = edge
+        if edge.source_id is not None:
+            self._outbound.setdefault(edge.source_id, {})[edge.id] = edge
+        if edge.target_id is not None:
+            self._inbound.setdefault(edge.target_id, {})[edge.id] = edge
+
     def _add_edge(self, proxy: EntityProxy, source: str, target: str) -> None:
         if proxy.schema.source_prop is None:
             raise InvalidModel("Invalid edge entity: %r" % proxy)
@@ -238,7 +249,7 @@ class Graph(object):
         target_node = self._get_node_stub(proxy.schema.target_prop, target)
         if source_node.id is not None and target_node.id is not None:
             edge = Edge(self, source_node, target_node, proxy=proxy)
-            self.edges[edge.id] = edge
+            self._index_edge(edge)
 
     def _add_node(self, proxy: EntityProxy) -> None:
         """Derive a node and its value edges from the given proxy."""
@@ -253,7 +264,7 @@ class Graph(object):
                 continue
             edge = Edge(self, entity, node, prop=prop, value=value)
             if edge.weight > 0:
-                self.edges[edge.id] = edge
+                self._index_edge(edge)
 
     def add(self, proxy: EntityProxy) -> None:
         """Add an :class:`~followthemoney.proxy.EntityProxy` to the graph and make
@@ -280,21 +291,23 @@ class Graph(object):
         self, node: Node, prop: Optional[Property] = None
     ) -> Generator[Edge, None, None]:
         """Get all edges pointed out from the given node."""
-        for edge in self.iteredges():
-            if edge.source == node:
-                if prop and edge.source_prop != prop:
-                    continue
-                yield edge
+        if node.id is None:
+            return
+        for edge in self._outbound.get(node.id, {}).values():
+            if prop and edge.source_prop != prop:
+                continue
+            yield edge
 
     def get_inbound(
         self, node: Node, prop: Optional[Property] = None
     ) -> Generator[Edge, None, None]:
         """Get all edges pointed at the given node."""
-        for edge in self.iteredges():
-            if edge.target == node:
-                if prop and edge.target_prop != prop:
-                    continue
-                yield edge
+        if node.id is None:
+            return
+        for edge in self._inbound.get(node.id, {}).values():
+            if prop and edge.target_prop != prop:
+                continue
+            yield edge
 
     def get_adjacent(
         self, node: Node, prop: Optional[Property] = None
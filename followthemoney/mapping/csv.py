@@ -1,9 +1,12 @@
 import io
 import os
 import logging
+import tempfile
 from banal.lists import ensure_list
 import requests
-from csv import DictReader
+from csv import DictReader, reader
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
 from urllib.parse import urlparse
 from banal import keys_values
 from typing import (
@@ -21,7 +24,7 @@ from typing import (
 )
 
 from followthemoney.mapping.source import Record, Source
-from followthemoney.util import sanitize_text
+from followthemoney.util import MEGABYTE, sanitize_text
 from followthemoney.exc import InvalidMapping
 
 if TYPE_CHECKING:
@@ -29,6 +32,9 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 FilterList = List[Tuple[str, Set[Optional[str]]]]
+IndexFilterList = List[Tuple[Optional[int], Set[Optional[str]]]]
+BATCH_SIZE = 10000
+DOWNLOAD_CHUNK = MEGABYTE
 
 
 class CSVSource(Source):
@@ -43,8 +49,16 @@ class CSVSource(Source):
         if not len(self.urls):
             raise InvalidMapping("No CSV URLs are specified.")
 
+        #: The number of remote CSV files which are downloaded in the
+        #: background while the current file is being read.
+        self.prefetch = int(data.get("prefetch", 0))
+        if self.prefetch < 0:
+            raise InvalidMapping("Invalid prefetch: %r" % self.prefetch)
+
         self.filters_set = self._parse_filters(self.filters)
         self.filters_not_set = self._parse_filters(self.filters_not)
+        #: The columns which are included in the generated records.
+        self.columns: Set[str] = set(query.refs)
 
     def _parse_filters(self, filters: ItemsView[str, Any]) -> FilterList:
         filters_set: FilterList = []
@@ -72,26 +86,201 @@ class CSVSource(Source):
                     data[ref] = value
             yield data
 
-    def read_csv_url(self, url: str) -> Generator[Record, None, None]:
+    @staticmethod
+    def is_remote(url: str) -> bool:
+        return urlparse(url).scheme in ["http", "https"]
+
+    def read_csv_url(
+        self, url: str, session: Optional[requests.Session] = None
+    ) -> Generator[Record, None, None]:
         parsed_url = urlparse(url)
         log.info("Loading: %s", url)
-        if parsed_url.scheme in ["http", "https"]:
-            res = requests.get(url, stream=True)
+        if self.is_remote(url):
+            getter = session.get if session is not None else requests.get
+            res = getter(url, stream=True)
             if not res.ok:
                 raise InvalidMapping("Failed to open CSV: %s" % url)
             # if res.encoding is None:
             res.encoding = "utf-8"
             # log.info("Detected encoding: %s", res.encoding)
             lines = res.iter_lines(decode_unicode=True)
-            yield from self.read_csv(lines)
+            yield from self.read_records(lines)
         else:
             with io.open(parsed_url.path, "r") as fh:
-                yield from self.read_csv(fh)
+                yield from self.read_records(fh)
+
+    def download(self, session: requests.Session, url: str) -> str:
+        """Download a remote CSV file to a temporary file and return its path.
+        The caller is responsible for deleting the file."""
+        log.info("Prefetching: %s", url)
+        res = session.get(url, stream=True)
+        if not res.ok:
+            raise InvalidMapping("Failed to open CSV: %s" % url)
+        fd, path = tempfile.mkstemp(prefix="ftm-csv-", suffix=".csv")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in res.iter_content(chunk_size=DOWNLOAD_CHUNK):
+                    fh.write(chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+    def read_prefetched(
+        self, session: requests.Session
+    ) -> Generator[Record, None, None]:
+        """Read all CSV files, while the next ``prefetch`` remote files are
+        downloaded by a thread pool. The current file is streamed rather than
+        downloaded, unless it has already been prefetched. The files are read
+        in the same order as without prefetching."""
+        urls = list(self.urls)
+        pending: Dict[int, "Future[str]"] = {}
+        pool = ThreadPoolExecutor(max_workers=self.prefetch)
+        try:
+            for index, url in enumerate(urls):
+                for ahead in range(index + 1, index + 1 + self.prefetch):
+                    if ahead >= len(urls) or ahead in pending:
+                        continue
+                    if self.is_remote(urls[ahead]):
+                        download = pool.submit(self.download, session, urls[ahead])
+                        pending[ahead] = download
+                future = pending.pop(index, None)
+                # A download which has not started yet is replaced by streaming:
+                if future is None or future.cancel():
+                    yield from self.read_csv_url(url, session=session)
+                    continue
+                path = future.result()
+                try:
+                    log.info("Loading: %s", url)
+                    with io.open(path, "r", encoding="utf-8") as fh:
+                        yield from self.read_records(fh)
+                finally:
+                    os.unlink(path)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future in pending.values():
+                if future.cancelled():
+                    continue
+                if future.exception() is None:
+                    os.unlink(future.result())
+
+    def _index_filters(
+        self, indexes: Dict[str, int], filters: FilterList
+    ) -> IndexFilterList:
+        return [(indexes.get(k), v) for (k, v) in filters]
+
+    def _column_indexes(
+        self, header: List[str]
+    ) -> Tuple[List[Tuple[str, int]], IndexFilterList, IndexFilterList]:
+        """Map the used columns and the filters to their position in the rows
+        of a CSV file with the given header."""
+        # Like DictReader, the last of several columns with the same name wins:
+        indexes = {name: index for (index, name) in enumerate(header)}
+        columns = [(n, i) for (n, i) in indexes.items() if n in self.columns]
+        filters = self._index_filters(indexes, self.filters_set)
+        filters_not = self._index_filters(indexes, self.filters_not_set)
+        return columns, filters, filters_not
+
+    @staticmethod
+    def _row_value(row: List[str], index: Optional[int]) -> Optional[str]:
+        if index is None or index >= len(row):
+            return None
+        return sanitize_text(row[index])
+
+    def _check_row(
+        self, row: List[str], filters: IndexFilterList, filters_not: IndexFilterList
+    ) -> bool:
+        for index, values in filters:
+            if self._row_value(row, index) not in values:
+                return False
+        for index, values in filters_not:
+            if self._row_value(row, index) in values:
+                return False
+        return True
+
+    def read_records(self, fh: Iterable[str]) -> Generator[Record, None, None]:
+        """Read the rows of a CSV file which match the filters of the query.
+        The filters are applied to the raw rows, and only the columns used by
+        the query mapping are sanitised and included in the records."""
+        rows = reader(fh, skipinitialspace=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns, filters, filters_not = self._column_indexes(header)
+        for row in rows:
+            # Skip blank lines, like DictReader:
+            if not len(row) or not self._check_row(row, filters, filters_not):
+                continue
+            data: Record = {}
+            for name, index in columns:
+                if index < len(row):
+                    value = sanitize_text(row[index])
+                    if value is not None:
+                        data[name] = value
+            yield data
 
     @property
     def records(self) -> Generator[Record, None, None]:
         """Iterate through the table applying filters on-the-go."""
-        for url in self.urls:
-            for record in self.read_csv_url(url):
-                if self.check_filters(record):
-                    yield record
+        with requests.Session() as session:
+            if self.prefetch > 0:
+                yield from self.read_prefetched(session)
+                return
+            for url in self.urls:
+                yield from self.read_csv_url(url, session=session)
+
+
+class ColumnarCSVSource(CSVSource):
+    """Read a CSV file in batches of rows, and process the values of each batch
+    column by column. The filter columns are evaluated first, and each distinct
+    value in a column of a batch is sanitised only once. This is selected by
+    setting ``csv_reader: columnar`` in the query mapping."""
+
+    def __init__(self, query: "QueryMapping", data: Dict[str, Any]) -> None:
+        super().__init__(query, data)
+        self.batch_size = int(data.get("batch_size", BATCH_SIZE))
+
+    def _clean_column(
+        self, batch: List[List[str]], index: Optional[int]
+    ) -> List[Optional[str]]:
+        if index is None:
+            return [None for _ in batch]
+        values = [r[index] if index < len(r) else None for r in batch]
+        clean = {v: sanitize_text(v) for v in set(values)}
+        return [clean[v] for v in values]
+
+    def _filter_batch(
+        self,
+        batch: List[List[str]],
+        filters: IndexFilterList,
+        filters_not: IndexFilterList,
+    ) -> List[List[str]]:
+        for index, values in filters:
+            column = self._clean_column(batch, index)
+            batch = [r for (r, v) in zip(batch, column) if v in values]
+        for index, values in filters_not:
+            column = self._clean_column(batch, index)
+            batch = [r for (r, v) in zip(batch, column) if v not in values]
+        return batch
+
+    def read_records(self, fh: Iterable[str]) -> Generator[Record, None, None]:
+        rows = reader(fh, skipinitialspace=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns, filters, filters_not = self._column_indexes(header)
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not len(chunk):
+                break
+            # Skip blank lines, like DictReader:
+            batch = [r for r in chunk if len(r)]
+            batch = self._filter_batch(batch, filters, filters_not)
+            cleaned = [(n, self._clean_column(batch, i)) for (n, i) in columns]
+            for offset in range(len(batch)):
+                data: Record = {}
+                for name, column in cleaned:
+                    value = column[offset]
+                    if value is not None:
+                        data[name] = value
+                yield data
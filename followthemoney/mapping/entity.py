@@ -30,6 +30,8 @@ class EntityMapping(object):
         "refs",
         "dependencies",
         "properties",
+        "plan",
+        "required",
     )
 
     def __init__(
@@ -83,6 +85,20 @@ class EntityMapping(object):
             if mapping.entity:
                 self.dependencies.add(mapping.entity)
 
+        # THIS IS HACKY
+        # Some of the converters, e.g. for phone numbers, work better if they
+        # know the country which the number is from. In order to provide that
+        # detail, country fields are mapped first, making the data from them
+        # accessible to phone and address parsers.
+        self.plan: List[PropertyMapping] = []
+        for mapping in self.properties:
+            if mapping.prop.type == registry.country:
+                self.plan.append(mapping)
+        for mapping in self.properties:
+            if mapping.prop.type != registry.country:
+                self.plan.append(mapping)
+        self.required = [m for m in self.properties if m.required]
+
     def bind(self) -> None:
         for prop in self.properties:
             prop.bind()
@@ -92,41 +108,27 @@ class EntityMapping(object):
         if self.id_column is not None:
             return record.get(self.id_column)
         values = [key_bytes(record.get(k)) for k in self.keys]
+        values = [v for v in values if len(v)]
+        if not len(values):
+            return None
+        if len(values) > 1:
+            values.sort()
         digest = self.seed.copy()
-        has_value = False
-        for value in sorted(values):
-            if len(value):
-                has_value = True
-                digest.update(value)
-        if has_value:
-            return digest.hexdigest()
-        return None
+        for value in values:
+            digest.update(value)
+        return digest.hexdigest()
 
     def map(
         self, record: Record, entities: Dict[str, EntityProxy]
     ) -> Optional[EntityProxy]:
         proxy = self.model.make_entity(self.schema)
 
-        # THIS IS HACKY
-        # Some of the converters, e.g. for phone numbers, work better if they
-        # know the country which the number is from. In order to provide that
-        # detail, we are first running country fields, then making the data
-        # from that accessible to phone and address parsers.
-        for prop in self.properties:
-            if prop.prop.type == registry.country:
-                discarded_values = prop.map(proxy, record, entities)
-                for value in discarded_values:
-                    log.warning(
-                        f'[{self.name}] Discarded unclean value "{value}" for property "{prop.prop.qname}".'
-                    )
-
-        for prop in self.properties:
-            if prop.prop.type != registry.country:
-                discarded_values = prop.map(proxy, record, entities)
-                for value in discarded_values:
-                    log.warning(
-                        f'[{self.name}] Discarding unclean value "{value}" for property "{prop.prop.qname}".'
-                    )
+        for prop in self.plan:
+            discarded_values = prop.map(proxy, record, entities)
+            for value in discarded_values:
+                log.warning(
+                    f'[{self.name}] Discarding unclean value "{value}" for property "{prop.prop.qname}".'
+                )
 
         # Generate the ID at the end to avoid self-reference checks on empty
         # keys.
@@ -142,8 +144,8 @@ class EntityMapping(object):
                 )
             return None
 
-        for prop in self.properties:
-            if prop.required and not proxy.has(prop.prop):
+        for prop in self.required:
+            if not proxy.has(prop.prop):
                 # This is a bit weird, it flags fields to be required in
                 # the mapping, not in the model. Basically it means: if
                 # this row of source data doesn't have that field, then do
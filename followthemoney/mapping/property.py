@@ -2,7 +2,7 @@ import re
 from copy import deepcopy
 from warnings import warn
 from normality import stringify
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
 from banal import keys_values, as_bool
 
 from followthemoney.helpers import inline_names
@@ -32,6 +32,7 @@ class PropertyMapping(object):
         "required",
         "literals",
         "template",
+        "template_parts",
         "replacements",
     )
 
@@ -55,11 +56,19 @@ class PropertyMapping(object):
 
         self.template = sanitize_text(data.pop("template", None))
         self.replacements: Dict[str, str] = {}
+        # The template is split up into literal text and references, which
+        # are flagged as such, so that it can be filled in with one join.
+        self.template_parts: List[Tuple[bool, str]] = []
         if self.template is not None:
             # this is hacky, trying to generate refs from template
-            for ref in self.FORMAT_PATTERN.findall(self.template):
-                self.refs.append(ref)
-                self.replacements["{{%s}}" % ref] = ref
+            parts = self.FORMAT_PATTERN.split(self.template)
+            for index, part in enumerate(parts):
+                is_ref = index % 2 == 1
+                if is_ref:
+                    self.refs.append(part)
+                    self.replacements["{{%s}}" % part] = part
+                if is_ref or len(part):
+                    self.template_parts.append((is_ref, part))
 
     def bind(self) -> None:
         if self.prop.stub:
@@ -97,10 +106,8 @@ class PropertyMapping(object):
         if self.template is not None:
             # replace mentions of any refs with the values present in the
             # current record
-            value = self.template
-            for repl, ref in self.replacements.items():
-                ref_value = record.get(ref) or ""
-                value = value.replace(repl, ref_value)
+            parts = self.template_parts
+            value = "".join([(record.get(p) or "") if r else p for r, p in parts])
             return [value.strip()]
 
         values = list(self.literals)
@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING, Any, List, Optional, Set, Dict
 from followthemoney.proxy import EntityProxy
 from followthemoney.mapping.entity import EntityMapping
 from followthemoney.mapping.sql import SQLSource
-from followthemoney.mapping.csv import CSVSource
+from followthemoney.mapping.csv import CSVSource, ColumnarCSVSource
 from followthemoney.exc import InvalidMapping
 
 if TYPE_CHECKING:
@@ -57,6 +57,11 @@ class QueryMapping:
         if "database" in data:
             return SQLSource(self, data)
         if "csv_url" in data or "csv_urls" in data:
+            reader = data.get("csv_reader", "rows")
+            if reader == "columnar":
+                return ColumnarCSVSource(self, data)
+            if reader != "rows":
+                raise InvalidMapping("Invalid CSV reader: %r" % reader)
             return CSVSource(self, data)
         raise InvalidMapping("Cannot determine mapping type: %r" % data)
 
@@ -1,12 +1,18 @@
 import os
 import logging
+import threading
+from itertools import chain
 from uuid import uuid4
-from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Union, cast
-from banal import ensure_list, is_listish, keys_values
-from sqlalchemy import MetaData, func
+from queue import Queue
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Tuple, Union
+from typing import Iterable, Sequence, cast
+from banal import ensure_dict, ensure_list, is_listish, keys_values
+from normality import stringify
+from sqlalchemy import Integer, MetaData, Numeric, and_, false, func, or_, tuple_
 from sqlalchemy.future import select
 from sqlalchemy.engine import Engine, create_engine
-from sqlalchemy.sql.elements import Label
+from sqlalchemy.engine.row import Row
+from sqlalchemy.sql.elements import ColumnElement, Label
 from sqlalchemy.pool import NullPool
 from sqlalchemy.schema import Table
 from sqlalchemy.sql.expression import Select
@@ -21,6 +27,7 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 DATA_PAGE = 1000
+PARTITION_METHODS = ("modulo", "range")
 
 
 class QueryTable(object):
@@ -55,12 +62,48 @@ class SQLSource(Source):
         if database is None:
             raise InvalidMapping("No database in SQL mapping!")
         self.database_uri = cast(str, os.path.expandvars(database))
-        self.engine = create_engine(self.database_uri, poolclass=NullPool)
+
+        #: The number of rows fetched from the database at a time.
+        self.page_size = int(data.get("page_size", DATA_PAGE))
+        if self.page_size < 1:
+            raise InvalidMapping("Invalid page size: %r" % self.page_size)
+
+        # Instead of running a single query, the data can be read in pages
+        # using keyset pagination on a set of columns which uniquely identify
+        # each row. Multiple readers split up the range of the first column
+        # and read their pages in parallel.
+        pagination: Dict[str, Any] = ensure_dict(data.get("pagination"))
+        self.page_columns = cast(
+            List[str], keys_values(pagination, "column", "columns")
+        )
+        self.page_readers = int(pagination.get("readers", 1))
+        if self.page_readers > 1 and not len(self.page_columns):
+            raise InvalidMapping("Parallel readers require pagination columns.")
+        if self.page_readers > 1:
+            self.engine = create_engine(self.database_uri, pool_size=self.page_readers)
+        else:
+            self.engine = create_engine(self.database_uri, poolclass=NullPool)
         self.meta = MetaData()
 
         tables = keys_values(data, "table", "tables")
         self.tables = [QueryTable(self.meta, self.engine, f) for f in tables]
         self.joins = cast(List[Dict[str, str]], ensure_list(data.get("joins")))
+        if self.page_readers > 1:
+            self._check_numeric(self.page_columns[0])
+
+        # A query can be split into partitions by the values of a numeric
+        # column, which can then be read in parallel (see `set_partition`).
+        partition: Dict[str, Any] = ensure_dict(data.get("partition"))
+        self.partition_column = stringify(partition.get("column"))
+        self.partition_method = partition.get("method", "modulo")
+        if self.partition_method not in PARTITION_METHODS:
+            msg = "Invalid partition method: %r" % self.partition_method
+            raise InvalidMapping(msg)
+        if self.partition_column is not None:
+            self._check_numeric(self.partition_column)
+        self.partition_count = cast(Optional[int], partition.get("count"))
+        self.partition: Optional[Tuple[int, int]] = None
+        self._partition_bounds: Optional[Tuple[Any, Any]] = None
 
     def get_column(self, ref: Optional[str]) -> Label[Any]:
         for table in self.tables:
@@ -68,6 +111,14 @@ class SQLSource(Source):
                 return table.refs[ref]
         raise InvalidMapping("Missing reference: %s" % ref)
 
+    def _check_numeric(self, ref: str) -> None:
+        """The rows of a query can only be split up by the values of a column
+        (for parallel readers and partitions) if its values are numbers."""
+        column = self.get_column(ref)
+        if not isinstance(column.type, (Integer, Numeric)):
+            msg = "Column must be numeric to split up a query: %s (%s)"
+            raise InvalidMapping(msg % (ref, column.type))
+
     def apply_filters(self, q: Select) -> Select:
         for col, val in self.filters:
             if is_listish(val):
@@ -88,37 +139,206 @@ class SQLSource(Source):
             q = q.where(left == right)
         return q
 
+    def set_partition(self, index: int, count: int) -> None:
+        """Only read the given part (counting from zero) of the data, if it is
+        split into ``count`` partitions using the partition column."""
+        if self.partition_column is None:
+            raise InvalidMapping("No partition column is specified.")
+        if index < 0 or index >= count:
+            raise InvalidMapping("Invalid partition: %d of %d" % (index, count))
+        self.partition = (index, count)
+
+    def _bounds(self, column: Label[Any], partitioned: bool) -> Tuple[Any, Any]:
+        q = select(func.min(column), func.max(column))
+        q = q.select_from(*[t.alias for t in self.tables])
+        q = self.apply_filters(q)
+        if partitioned:
+            q = self.apply_partition(q)
+        with self.engine.connect() as conn:
+            lowest, highest = conn.execute(q).one()
+        return lowest, highest
+
+    def _interval(
+        self, column: Label[Any], bounds: Tuple[Any, Any], index: int, count: int
+    ) -> Optional[ColumnElement[Any]]:
+        """Split the range of values of the column into equal intervals, and
+        return a condition for the one with the given index."""
+        lowest, highest = bounds
+        if lowest is None or highest is None:
+            return None
+        step = (highest - lowest) / count
+        lower = lowest + (step * index)
+        if index == count - 1:
+            return and_(column >= lower, column <= highest)
+        upper = lowest + (step * (index + 1))
+        return and_(column >= lower, column < upper)
+
+    def apply_partition(self, q: Select) -> Select:
+        if self.partition is None or self.partition_column is None:
+            return q
+        index, count = self.partition
+        column = self.get_column(self.partition_column)
+        condition: Optional[ColumnElement[Any]] = None
+        if self.partition_method == "modulo":
+            # SQL keeps the sign in a modulo, so negative values are shifted:
+            condition = ((column % count) + count) % count == index
+        else:
+            # The range of the column is the same for all partitions, so it is
+            # only queried once:
+            if self._partition_bounds is None:
+                self._partition_bounds = self._bounds(column, partitioned=False)
+            bounds = self._partition_bounds
+            condition = self._interval(column, bounds, index, count)
+        # Rows without a value in the partition column go to the first one:
+        if index == 0:
+            if condition is None:
+                return q.where(column.is_(None))
+            return q.where(or_(condition, column.is_(None)))
+        if condition is None:
+            return q.where(false())
+        return q.where(condition)
+
     def compose_query(self) -> Select:
         columns = [self.get_column(r) for r in self.query.refs]
         q = select(*columns)
         q = q.select_from(*[t.alias for t in self.tables])
-        return self.apply_filters(q)
+        return self.apply_partition(self.apply_filters(q))
 
-    @property
-    def records(self) -> Generator[Record, None, None]:
-        """Compose the actual query and return an iterator of ``Record``."""
-        mapping = [(r, self.get_column(r).name) for r in self.query.refs]
-        q = self.compose_query()
+    def _make_record(self, row: Row, mapping: List[Tuple[str, str]]) -> Record:
+        row_map = row._mapping
+        data: Record = {}
+        for ref, name in mapping:
+            value = sanitize_text(row_map[name])
+            if value is not None:
+                data[ref] = value
+        return data
+
+    def _stream_pages(
+        self, q: Select, mapping: List[Tuple[str, str]]
+    ) -> Generator[List[Record], None, None]:
+        """Run a query in a single, streaming transaction and return the
+        resulting records in pages."""
         log.info("Query: %s", q)
         with self.engine.connect() as conn:
             rp = conn.execution_options(stream_results=True).execute(q)
             while True:
-                rows = rp.fetchmany(size=DATA_PAGE)
+                rows = rp.fetchmany(size=self.page_size)
                 if not len(rows):
                     break
-                for row in rows:
-                    row_map = row._mapping
-                    data: Record = {}
-                    for ref, name in mapping:
-                        value = sanitize_text(row_map[name])
-                        if value is not None:
-                            data[ref] = value
-                    yield data
+                yield [self._make_record(row, mapping) for row in rows]
+
+    def _read_pages(
+        self, interval: Optional[ColumnElement[Any]] = None
+    ) -> Generator[List[Record], None, None]:
+        """Read the data in pages, using keyset pagination: each page is a
+        separate query for the rows following the last row of the previous
+        page, so that no long-running transaction is needed. Rows with a NULL
+        in any of the pagination columns are skipped (see `_read_null_keys`),
+        because they cannot be compared to the last row."""
+        mapping = [(r, self.get_column(r).name) for r in self.query.refs]
+        keys = [self.get_column(c) for c in self.page_columns]
+        q = self.compose_query()
+        selected = set(name for _, name in mapping)
+        q = q.add_columns(*[k for k in keys if k.name not in selected])
+        q = q.where(and_(*[k.is_not(None) for k in keys]))
+        if interval is not None:
+            q = q.where(interval)
+        q = q.order_by(*keys).limit(self.page_size)
+        log.info("Query: %s", q)
+        last: Optional[Sequence[Any]] = None
+        while True:
+            page_q = q
+            if last is not None and len(keys) == 1:
+                page_q = q.where(keys[0] > last[0])
+            elif last is not None:
+                page_q = q.where(tuple_(*keys) > tuple_(*last))
+            with self.engine.connect() as conn:
+                rows = conn.execute(page_q).fetchall()
+            yield [self._make_record(row, mapping) for row in rows]
+            if len(rows) < self.page_size:
+                break
+            last = [rows[-1]._mapping[k.name] for k in keys]
+
+    def _read_null_keys(self) -> Generator[List[Record], None, None]:
+        """Read the rows which have a NULL in any of the pagination columns in
+        a single query, as they are not covered by the paginated queries."""
+        mapping = [(r, self.get_column(r).name) for r in self.query.refs]
+        keys = [self.get_column(c) for c in self.page_columns]
+        q = self.compose_query().where(or_(*[k.is_(None) for k in keys]))
+        yield from self._stream_pages(q, mapping)
+
+    def _read_parallel(self) -> Generator[List[Record], None, None]:
+        """Read pages in several threads, each covering part of the range of
+        the first pagination column. Another thread reads the rows without a
+        value in one of the pagination columns. Pages are yielded as they
+        arrive."""
+        column = self.get_column(self.page_columns[0])
+        bounds = self._bounds(column, partitioned=True)
+        readers = self.page_readers if bounds[0] is not None else 1
+        pages: "Queue[Union[List[Record], Exception, None]]" = Queue(
+            maxsize=readers * 2
+        )
+        stop = threading.Event()
+
+        def reader(index: int) -> None:
+            try:
+                if index == readers:
+                    source = self._read_null_keys()
+                else:
+                    interval = self._interval(column, bounds, index, readers)
+                    source = self._read_pages(interval)
+                for page in source:
+                    if stop.is_set():
+                        return
+                    pages.put(page)
+            except Exception as exc:
+                pages.put(exc)
+            finally:
+                pages.put(None)
+
+        threads = []
+        for index in range(readers + 1):
+            thread = threading.Thread(target=reader, args=(index,), daemon=True)
+            thread.start()
+            threads.append(thread)
+        try:
+            active = len(threads)
+            while active > 0:
+                page = pages.get()
+                if page is None:
+                    active -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            stop.set()
+            # Unblock any readers waiting to submit a page:
+            while any(t.is_alive() for t in threads):
+                while not pages.empty():
+                    pages.get_nowait()
+                for thread in threads:
+                    thread.join(timeout=0.01)
+
+    @property
+    def records(self) -> Generator[Record, None, None]:
+        """Compose the actual query and return an iterator of ``Record``."""
+        pages: Iterable[List[Record]]
+        if len(self.page_columns):
+            if self.page_readers > 1:
+                pages = self._read_parallel()
+            else:
+                pages = chain(self._read_pages(), self._read_null_keys())
+        else:
+            mapping = [(r, self.get_column(r).name) for r in self.query.refs]
+            pages = self._stream_pages(self.compose_query(), mapping)
+        for page in pages:
+            yield from page
 
     def __len__(self) -> int:
         q = select(func.count("*"))
         q = q.select_from(*[t.alias for t in self.tables])
-        q = self.apply_filters(q)
+        q = self.apply_partition(self.apply_filters(q))
         with self.engine.connect() as conn:
             rp = conn.execute(q)
             return int(rp.scalar() or 0)
@@ -1,30 +1,95 @@
 import os
 import yaml
+import orjson
+from hashlib import sha1
 from functools import lru_cache
-from typing import Any, Dict, Generator, Iterator, Optional, Set, TypedDict, Union
+from typing import Any, Dict, Generator, Iterator, List, Optional, Set, TypedDict, Union
 
 from followthemoney.types import registry
 from followthemoney.types.common import PropertyType, PropertyTypeToDict
-from followthemoney.schema import Schema, SchemaToDict
+from followthemoney.schema import Schema, SchemaSpec, SchemaToDict
 from followthemoney.property import Property
 from followthemoney.mapping import QueryMapping
 from followthemoney.proxy import EntityProxy
+from followthemoney.compact import CompactEntityProxy
 from followthemoney.exc import InvalidModel, InvalidData
 
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class ModelToDict(TypedDict):
     schemata: Dict[str, SchemaToDict]
     types: Dict[str, PropertyTypeToDict]
 
 
+def _model_files(path: str) -> Generator[str, None, None]:
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            yield os.path.join(dirpath, filename)
+
+
+def model_digest(path: str) -> str:
+    """Compute a checksum of the YAML model definitions in the given directory,
+    used to check if a model snapshot is up to date."""
+    digest = sha1()
+    for filepath in sorted(_model_files(path)):
+        digest.update(os.path.relpath(filepath, path).encode("utf-8"))
+        with open(filepath, "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def load_specs(path: str) -> Dict[str, SchemaSpec]:
+    """Parse all the YAML schema definitions in the given directory."""
+    specs: Dict[str, SchemaSpec] = {}
+    for filepath in _model_files(path):
+        with open(filepath, "r", encoding="utf-8") as fh:
+            data = yaml.load(fh, Loader=SafeLoader)
+            if not isinstance(data, dict):
+                raise InvalidModel("Model file is not a mapping: %s" % filepath)
+            specs.update(data)
+    return specs
+
+
+def write_snapshot(path: str, snapshot_path: str) -> None:
+    """Store the schema definitions from the given model directory in a single
+    JSON file, which is much faster to load than the YAML sources."""
+    data = {"digest": model_digest(path), "schemata": load_specs(path)}
+    with open(snapshot_path, "wb") as fh:
+        fh.write(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+
+
+def read_snapshot(path: str, snapshot_path: str) -> Optional[Dict[str, SchemaSpec]]:
+    """Load the schema definitions from a snapshot, if it exists and has been
+    generated from the current contents of the model directory."""
+    try:
+        with open(snapshot_path, "rb") as fh:
+            data = orjson.loads(fh.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if data.get("digest") != model_digest(path):
+        return None
+    schemata: Dict[str, SchemaSpec] = data["schemata"]
+    return schemata
+
+
 class Model(object):
     """A collection of all the schemata available in followthemoney. The model
     provides some helper functions to find schemata, properties or to instantiate
-    entity proxies based on the schema metadata."""
+    entity proxies based on the schema metadata.
 
-    __slots__ = ("path", "schemata", "properties", "qnames")
+    If ``lazy`` is set, schemata are only instantiated when they are first
+    requested. This makes the model cheaper to load for programs which only use
+    a few schemata. Iterating the model, or serialising it, loads all schemata.
+    A lazily loaded schema has the same properties as in a fully loaded model,
+    but note that :attr:`schemata` and the :attr:`~Schema.descendants` of a
+    schema only include the schemata loaded so far."""
 
-    def __init__(self, path: str) -> None:
+    __slots__ = ("path", "schemata", "properties", "qnames", "_specs", "_referrers")
+
+    def __init__(
+        self, path: str, snapshot: Optional[str] = None, lazy: bool = False
+    ) -> None:
         self.path = path
 
         #: A mapping with all schemata, organised by their name.
@@ -33,9 +98,61 @@ class Model(object):
         #: All properties defined in the model.
         self.properties: Set[Property] = set()
         self.qnames: Dict[str, Property] = {}
-        for path, _, filenames in os.walk(self.path):
-            for filename in filenames:
-                self._load(os.path.join(path, filename))
+
+        # A snapshot of the model definitions (see `write_snapshot`) is used if
+        # it matches the YAML files in the model path.
+        specs = None
+        if snapshot is not None:
+            specs = read_snapshot(self.path, snapshot)
+        if specs is None:
+            specs = load_specs(self.path)
+
+        # In lazy mode, schemata are only instantiated when they are first
+        # requested via `get`. Until the model is fully loaded, this holds the
+        # definitions of all schemata.
+        self._specs: Optional[Dict[str, SchemaSpec]] = specs
+
+        # The names of the schemata which define a property with a reverse that
+        # points at a given schema, used to load reverse properties lazily.
+        self._referrers: Dict[str, List[str]] = {}
+        if not lazy:
+            self._load_all()
+            return
+        for name, spec in specs.items():
+            for prop in (spec.get("properties") or {}).values():
+                range_ = prop.get("range")
+                if range_ is not None and prop.get("reverse"):
+                    self._referrers.setdefault(range_, []).append(name)
+
+    def _load(self, name: str) -> Optional[Schema]:
+        """Instantiate a single schema in a lazy model. Generating the schema
+        will also load its parents and the schemata referenced by its entity
+        properties. In order to add its reverse properties, the schemata which
+        define the forward properties pointing at the schema are loaded, too."""
+        if self._specs is None or name not in self._specs:
+            return None
+        schema = Schema(self, name, self._specs[name])
+        self.schemata[name] = schema
+        schema.generate(self)
+        for referrer in self._referrers.get(name, []):
+            self.get(referrer)
+        self._propagate()
+        return schema
+
+    def _load_all(self) -> None:
+        """Instantiate all schemata which have not been loaded yet, keeping the
+        order in which they are defined."""
+        if self._specs is None:
+            return
+        schemata: Dict[str, Schema] = {}
+        for name, config in self._specs.items():
+            schema = self.schemata.get(name)
+            if schema is None:
+                schema = Schema(self, name, config)
+            schemata[name] = schema
+        self.schemata = schemata
+        self._specs = None
+        self._referrers = {}
         self.generate()
 
     def generate(self) -> None:
@@ -46,29 +163,31 @@ class Model(object):
         schemata."""
         for schema in self:
             schema.generate(self)
+        self._propagate()
+
+    def _propagate(self) -> None:
         for prop in self.properties:
             self.qnames[prop.qname] = prop
             for schema in prop.schema.descendants:
                 if prop.name not in schema.properties:
                     schema.properties[prop.name] = prop
 
-    def _load(self, filepath: str) -> None:
-        with open(filepath, "r", encoding="utf-8") as fh:
-            data = yaml.safe_load(fh)
-            if not isinstance(data, dict):
-                raise InvalidModel("Model file is not a mapping: %s" % filepath)
-            for name, config in data.items():
-                self.schemata[name] = Schema(self, name, config)
-
     def get(self, name: Union[str, Schema]) -> Optional[Schema]:
         """Get a schema object based on a schema name. If the input is already
         a schema object, it will just be returned."""
         if isinstance(name, str):
-            return self.schemata.get(name)
+            schema = self.schemata.get(name)
+            if schema is None and self._specs is not None:
+                return self._load(name)
+            return schema
         return name
 
     def get_qname(self, qname: str) -> Optional[Property]:
         """Get a property object based on a qualified name (i.e. schema:property)."""
+        if qname not in self.qnames and self._specs is not None:
+            self.get(qname.split(":", 1)[0])
+            if qname not in self.qnames:
+                self._load_all()
         return self.qnames.get(qname)
 
     def __getitem__(self, name: str) -> Schema:
@@ -81,7 +200,7 @@ class Model(object):
     def get_type_schemata(self, type_: PropertyType) -> Set[Schema]:
         """Return all the schemata which have a property of the given type."""
         schemata = set()
-        for schema in self.schemata.values():
+        for schema in self:
             for prop in schema.properties.values():
                 if prop.type == type_:
                     schemata.add(schema)
@@ -128,22 +247,33 @@ class Model(object):
         raise InvalidData(msg % (left, right))
 
     def make_entity(
-        self, schema: Union[str, Schema], key_prefix: Optional[str] = None
+        self,
+        schema: Union[str, Schema],
+        key_prefix: Optional[str] = None,
+        compact: bool = False,
     ) -> EntityProxy:
-        """Instantiate an empty entity proxy of the given schema type."""
-        return EntityProxy(self, {"schema": schema}, key_prefix=key_prefix)
+        """Instantiate an empty entity proxy of the given schema type. If
+        ``compact`` is enabled, a memory-efficient
+        :class:`~followthemoney.compact.CompactEntityProxy` is returned."""
+        proxy_cls = CompactEntityProxy if compact else EntityProxy
+        return proxy_cls(self, {"schema": schema}, key_prefix=key_prefix)
 
-    def get_proxy(self, data: Dict[str, Any], cleaned: bool = True) -> EntityProxy:
+    def get_proxy(
+        self, data: Dict[str, Any], cleaned: bool = True, compact: bool = False
+    ) -> EntityProxy:
         """Create an entity proxy to reflect the entity data in the given
         dictionary. If ``cleaned`` is disabled, all property values are
         fully re-validated and normalised. Use this if handling input data
-        from an untrusted source."""
+        from an untrusted source. If ``compact`` is enabled, a memory-efficient
+        :class:`~followthemoney.compact.CompactEntityProxy` is returned."""
         if isinstance(data, EntityProxy):
             return data
-        return EntityProxy.from_dict(self, data, cleaned=cleaned)
+        proxy_cls = CompactEntityProxy if compact else EntityProxy
+        return proxy_cls.from_dict(self, data, cleaned=cleaned)
 
     def to_dict(self) -> ModelToDict:
         """Return metadata for all schemata and properties, in a serializable form."""
+        self._load_all()
         return {
             "schemata": {s.name: s.to_dict() for s in self.schemata.values()},
             "types": {t.name: t.to_dict() for t in registry.types},
@@ -151,4 +281,5 @@ class Model(object):
 
     def __iter__(self) -> Iterator[Schema]:
         """Iterate across all schemata."""
+        self._load_all()
         return iter(self.schemata.values())
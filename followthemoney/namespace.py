@@ -24,11 +24,17 @@ the server without compromising isolation.
 """
 
 import hmac
-from typing import Any, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from followthemoney.types import registry
+from followthemoney.types.common import CleanCache
 from followthemoney.proxy import E
-from followthemoney.util import key_bytes, get_entity_id
+from followthemoney.exc import InvalidData
+from followthemoney.util import key_bytes, gettext
+
+#: The number of signed entity IDs kept in memory by each namespace. Edges
+#: tend to reference the same nodes over and over again.
+SIGNATURE_CACHE = 2**16
 
 
 class Namespace(object):
@@ -42,6 +48,7 @@ class Namespace(object):
     def __init__(self, name: Optional[str] = None) -> None:
         self.bname = key_bytes(name) if name else b""
         self.hmac = hmac.new(self.bname, digestmod="sha1")
+        self._signed = CleanCache(SIGNATURE_CACHE)
 
     @classmethod
     def parse(cls, entity_id: str) -> Tuple[Optional[str], Optional[str]]:
@@ -72,6 +79,16 @@ class Namespace(object):
     def sign(self, entity_id: str) -> Optional[str]:
         """Apply a namespace signature to an entity ID, removing any
         previous namespace marker."""
+        if not isinstance(entity_id, str):
+            return self._sign(entity_id)
+        try:
+            return self._signed.get(entity_id)
+        except KeyError:
+            signed = self._sign(entity_id)
+            self._signed.put(entity_id, signed)
+            return signed
+
+    def _sign(self, entity_id: str) -> Optional[str]:
         parsed_id, _ = self.parse(entity_id)
         if not len(self.bname):
             return parsed_id
@@ -95,18 +112,36 @@ class Namespace(object):
     def apply(self, proxy: E, shallow: bool = False) -> E:
         """Rewrite an entity proxy so all IDs mentioned are limited to
         the namespace."""
-        signed = proxy.clone()
-        if proxy.id is not None:
-            signed.id = self.sign(proxy.id)
-        if not shallow:
-            for prop in proxy.iterprops():
-                if prop.type != registry.entity:
+        signed_id = self.sign(proxy.id) if proxy.id is not None else None
+        # Rather than cloning the entity and re-adding each entity reference
+        # with full cleaning, copy the value lists and sign references in place.
+        # Signed IDs are valid entity IDs by construction.
+        properties: Dict[str, List[str]] = {}
+        for name, values in proxy.properties.items():
+            prop = proxy.schema.properties[name]
+            if shallow or prop.type is not registry.entity:
+                properties[name] = values
+                continue
+            refs: List[str] = []
+            seen: Set[str] = set()
+            for value in values:
+                ref = self.sign(value)
+                if ref is None or ref in seen:
                     continue
-                for value in signed.pop(prop):
-                    entity_id = get_entity_id(value)
-                    if entity_id is not None:
-                        signed.add(prop, self.sign(entity_id))
-        return signed
+                if ref == signed_id:
+                    msg = gettext("Self-relationship (%s): %s")
+                    raise InvalidData(msg % (proxy.schema, ref))
+                seen.add(ref)
+                refs.append(ref)
+            if len(refs):
+                properties[name] = refs
+        data = dict(proxy.context)
+        if signed_id is not None:
+            data["id"] = signed_id
+        data["schema"] = proxy.schema
+        data["properties"] = properties
+        model = proxy.schema.model
+        return proxy.__class__.from_dict(model, data, trusted=True)
 
     @classmethod
     def make(cls, name: Union[str, "Namespace"]) -> "Namespace":
@@ -49,8 +49,12 @@ class EntityProxy(object):
         data: Dict[str, Any],
         key_prefix: Optional[str] = None,
         cleaned: bool = True,
+        trusted: bool = False,
     ):
-        data = dict(data or {})
+        # Trusted input (see :meth:`~from_dict`) is taken over as-is, without
+        # making a copy of the given dictionary.
+        if not trusted:
+            data = dict(data or {})
         properties = data.pop("properties", {})
         if not cleaned:
             properties = ensure_dict(properties)
@@ -85,7 +89,10 @@ class EntityProxy(object):
         for key, values in properties.items():
             if key not in self.schema.properties:
                 continue
-            if cleaned:
+            if trusted:
+                self._properties[key] = values
+                self._size += sum([len(v) for v in values])
+            elif cleaned:
                 # This does not call `self.add` as it might be called millions of times
                 # in some context and we want to avoid the performance overhead of
                 # doing so.
@@ -212,7 +219,11 @@ class EntityProxy(object):
         value is already valid unicode. Returns the value that has been added."""
         if not cleaned and value is not None:
             format = format or prop.format
-            value = prop.type.clean_text(value, fuzzy=fuzzy, format=format, proxy=self)
+            type_ = prop.type
+            if type_.cache_size > 0:
+                value = type_.clean(value, fuzzy=fuzzy, format=format, proxy=self)
+            else:
+                value = type_.clean_text(value, fuzzy=fuzzy, format=format, proxy=self)
 
         if value is None:
             return None
@@ -463,8 +474,8 @@ class EntityProxy(object):
             raise InvalidData(msg % (self.id, e))
 
         self.context = merge_context(self.context, other.context)
-        for prop, values in other._properties.items():
-            self.add(prop, values, cleaned=True, quiet=True)
+        for prop, value in other.itervalues():
+            self.unsafe_add(prop, value, cleaned=True)
         return self
 
     def __str__(self) -> str:
@@ -501,8 +512,14 @@ class EntityProxy(object):
         model: "Model",
         data: Dict[str, Any],
         cleaned: bool = True,
+        trusted: bool = False,
     ) -> E:
         """Instantiate a proxy based on the given model and serialised dictionary.
 
+        If ``trusted`` is set, the data is assumed to have been produced by
+        :meth:`~to_dict` (e.g. read from a stream written by ``ftm``): the
+        property values are used without de-duplicating them, and the given
+        dictionary is consumed instead of being copied.
+
         Use :meth:`followthemoney.model.Model.get_proxy` instead."""
-        return cls(model, data, cleaned=cleaned)
+        return cls(model, data, cleaned=cleaned, trusted=trusted)
@@ -228,6 +228,8 @@ class Schema:
                 self.schemata.add(ancestor)
                 self.names.add(ancestor.name)
                 ancestor.descendants.add(self)
+                # Descendants can be added after the fact in a lazy model:
+                ancestor._matchable_schemata = None
 
             if len(self._temporal_start) == 0 and parent.temporal_start:
                 if (
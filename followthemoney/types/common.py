@@ -1,9 +1,11 @@
 from inspect import cleandoc
 from itertools import product
+from collections import OrderedDict
 from babel.core import Locale
 from banal import ensure_list
 from normality import stringify
 from typing import Any, Dict, Optional, Sequence, Callable, TYPE_CHECKING, TypedDict
+from typing import Hashable, NamedTuple
 
 from followthemoney.rdf import Literal, Identifier
 from followthemoney.util import get_locale
@@ -26,6 +28,48 @@ class PropertyTypeToDict(TypedDict, total=False):
     values: Optional[EnumValues]
 
 
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class CleanCache(object):
+    """A bounded LRU cache mapping raw input values to their cleaned form. Failed
+    cleaning results (``None``) are cached as well."""
+
+    __slots__ = ("maxsize", "hits", "misses", "data")
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.data: "OrderedDict[Hashable, Optional[str]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Get a cached value. Raises ``KeyError`` if the key is not cached."""
+        try:
+            value = self.data[key]
+            self.data.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Optional[str]) -> None:
+        self.data[key] = value
+        while len(self.data) > self.maxsize:
+            try:
+                self.data.popitem(last=False)
+            except KeyError:
+                break
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.data))
+
+
 class PropertyType(object):
     """Base class for all property types."""
 
@@ -70,6 +114,14 @@ class PropertyType(object):
     Once the total size of all properties of this type has exceed the given limit,
     an entity will refuse to add further values."""
 
+    cache_size: int = 0
+    """The number of cleaned values to memoize for this type. Data often repeats
+    the same values (e.g. country names) many times, so types with an expensive
+    cleaning process keep the results in an LRU cache. Use
+    :meth:`~set_cache_size` to change this, or set it to 0 to disable caching."""
+
+    _cache: Optional[CleanCache] = None
+
     @property
     def docs(self) -> Optional[str]:
         if not self.__doc__:
@@ -94,11 +146,54 @@ class PropertyType(object):
     ) -> Optional[str]:
         """Create a clean version of a value of the type, suitable for storage
         in an entity proxy."""
+        if self.cache_size > 0 and isinstance(raw, str):
+            cache = self._cache
+            if cache is None:
+                cache = self._cache = CleanCache(self.cache_size)
+            key = self._cache_key(raw, fuzzy, format, proxy)
+            try:
+                return cache.get(key)
+            except KeyError:
+                value = self._clean(raw, fuzzy=fuzzy, format=format, proxy=proxy)
+                cache.put(key, value)
+                return value
+        return self._clean(raw, fuzzy=fuzzy, format=format, proxy=proxy)
+
+    def _clean(
+        self,
+        raw: Any,
+        fuzzy: bool = False,
+        format: Optional[str] = None,
+        proxy: Optional["EntityProxy"] = None,
+    ) -> Optional[str]:
         text = sanitize_text(raw)
         if text is None:
             return None
         return self.clean_text(text, fuzzy=fuzzy, format=format, proxy=proxy)
 
+    def _cache_key(
+        self,
+        raw: str,
+        fuzzy: bool,
+        format: Optional[str],
+        proxy: Optional["EntityProxy"],
+    ) -> Hashable:
+        """Build a key for the cleaning cache which captures all parameters that
+        affect the outcome of cleaning the given value."""
+        return (raw, fuzzy, format)
+
+    def set_cache_size(self, size: int) -> None:
+        """Change the number of memoized cleaning results, resetting the cache.
+        A size of 0 disables caching for this type."""
+        self.cache_size = size
+        self._cache = None
+
+    def cache_info(self) -> CacheInfo:
+        """Report cache hits, misses and the size of the cleaning cache."""
+        if self._cache is None:
+            return CacheInfo(0, 0, self.cache_size, 0)
+        return self._cache.info()
+
     def clean_text(
         self,
         text: str,
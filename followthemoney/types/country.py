@@ -23,6 +23,7 @@ class CountryType(EnumType):
     plural = _("Countries")
     matchable = True
     max_length = 16
+    cache_size = 10000
 
     def _locale_names(self, locale: Locale) -> EnumValues:
         return {t.code: t.name for t in get_ftm_countries()}
@@ -27,6 +27,7 @@ class DateType(PropertyType):
     plural = _("Dates")
     matchable = True
     max_length = 32
+    cache_size = 10000
 
     def validate(
         self, value: str, fuzzy: bool = False, format: Optional[str] = None
@@ -1,4 +1,4 @@
-from typing import Iterable, Optional, TYPE_CHECKING
+from typing import Hashable, Iterable, Optional, TYPE_CHECKING
 from phonenumbers import parse as parse_number
 from phonenumbers import is_valid_number, format_number
 from phonenumbers import PhoneNumber, PhoneNumberFormat
@@ -37,6 +37,20 @@ class PhoneType(PropertyType):
     matchable = True
     pivot = True
     max_length = 64
+    cache_size = 10000
+
+    def _cache_key(
+        self,
+        raw: str,
+        fuzzy: bool,
+        format: Optional[str],
+        proxy: Optional["EntityProxy"],
+    ) -> Hashable:
+        # Cleaning ignores fuzzy and format. Countries set on the proxy are used,
+        # in order, to parse numbers which do not have an international prefix:
+        if proxy is None or raw.startswith("+"):
+            return raw
+        return (raw, tuple(proxy.countries))
 
     def _clean_countries(
         self, proxy: Optional["EntityProxy"]
@@ -1,4 +1,6 @@
+import os
 import csv
+import gzip
 import shutil
 from tempfile import mkdtemp
 from unittest import TestCase
@@ -6,7 +8,6 @@ from unittest import TestCase
 from followthemoney import model
 from followthemoney.export.csv import CSVExporter
 
-
 ENTITY = {
     "id": "person",
     "schema": "Person",
@@ -41,3 +42,16 @@ class CSVExportTestCase(TestCase):
         props = exporter.exportable_properties(entity.schema)
         self.assertListEqual(rows[0], ["id", "source"] + [prop.name for prop in props])
         self.assertListEqual(rows[1][:3], ["person", "test", "Ralph Tester"])
+
+    def test_csv_export_compressed(self):
+        entity = model.get_proxy(ENTITY)
+        exporter = CSVExporter(self.outdir, compression="gzip")
+        exporter.write(entity)
+        exporter.finalize()
+        outfile = os.path.join(self.outdir, "Person.csv.gz")
+        with gzip.open(outfile, "rt") as fh:
+            rows = list(csv.reader(fh))
+        self.assertEqual(rows[0][0], "id")
+        self.assertListEqual(rows[1][:2], ["person", "Ralph Tester"])
+        with self.assertRaises(ValueError):
+            CSVExporter(self.outdir, compression="zip")
@@ -1,4 +1,6 @@
 import io
+import os
+import gzip
 import csv
 import shutil
 from tempfile import mkdtemp
@@ -8,6 +10,7 @@ from followthemoney import model
 from followthemoney.export.neo4j import CypherGraphExporter
 from followthemoney.export.neo4j import Neo4JCSVExporter
 from followthemoney.export.graph import edge_types
+from followthemoney.export.common import SpillSet
 
 ENTITIES = [
     {
@@ -68,6 +71,19 @@ class CypherExportTestCase(TestCase):
         assert "entity:company" in value, value
         assert "tel:+12025557612" in value, value
 
+    def test_cypher_memory_limit(self):
+        outputs = []
+        for memory_limit in (None, 1):
+            sio = io.StringIO()
+            exporter = CypherGraphExporter(
+                sio, edge_types=edge_types(), memory_limit=memory_limit
+            )
+            for entity in ENTITIES + ENTITIES:
+                exporter.write(model.get_proxy(entity))
+            exporter.finalize()
+            outputs.append(sio.getvalue())
+        assert outputs[0] == outputs[1]
+
 
 class Neo4JCSVTestCase(TestCase):
     def setUp(self):
@@ -98,3 +114,69 @@ class Neo4JCSVTestCase(TestCase):
         data = rows[1]
         assert "OWNERSHIP" in data, data
         assert "2003-04-01" in data, data
+
+    def test_csv_export_compressed(self):
+        exporter = Neo4JCSVExporter(self.outdir, compression="gzip")
+        for entity in ENTITIES:
+            exporter.write(model.get_proxy(entity))
+        exporter.finalize()
+        with open(os.path.join(self.outdir, "neo4j_import.sh")) as fh:
+            script = fh.read()
+        assert "--relationships=_links.csv.gz" in script, script
+        assert "--nodes=Person.csv.gz" in script, script
+        with gzip.open(os.path.join(self.outdir, "Person.csv.gz"), "rt") as fh:
+            rows = list(csv.reader(fh))
+        assert rows[1][2] == "Ralph Tester", rows
+        for compression in ("bz2", "xz", "zstd"):
+            with self.assertRaises(ValueError):
+                Neo4JCSVExporter(self.outdir, compression=compression)
+
+    def test_csv_export_memory_limit(self):
+        proxies = [model.get_proxy(e) for e in ENTITIES]
+        for i in range(20):
+            proxy = model.make_entity("Person")
+            proxy.id = "person-%s" % i
+            proxy.add("name", "Person %s" % i)
+            proxy.add("phone", "+1202555%04d" % (i % 5))
+            proxies.append(proxy)
+        outputs = []
+        for memory_limit in (None, 1):
+            outdir = os.path.join(self.outdir, str(memory_limit))
+            exporter = Neo4JCSVExporter(
+                outdir, edge_types=edge_types(), memory_limit=memory_limit
+            )
+            for proxy in proxies:
+                exporter.write(proxy)
+            spilled = exporter.nodes_seen.path
+            exporter.finalize()
+            if memory_limit is not None:
+                assert spilled is not None
+                assert not os.path.exists(spilled)
+            with open(os.path.join(outdir, "_nodes.csv")) as fh:
+                outputs.append(list(csv.reader(fh)))
+        assert outputs[0] == outputs[1]
+        ids = [row[0] for row in outputs[0]]
+        assert len(ids) == len(set(ids)), ids
+        assert "tel:+12025550004" in ids, ids
+
+
+class SpillSetTestCase(TestCase):
+    def test_spill_set(self):
+        values = SpillSet(memory_limit=1000)
+        for i in range(100):
+            values.add("value-%s" % (i % 50))
+        assert values.path is not None
+        assert len(values) == 50
+        assert "value-0" in values
+        assert "value-49" in values
+        assert "value-50" not in values
+        assert None not in values
+        path = values.path
+        values.close()
+        assert not os.path.exists(path)
+
+        values = SpillSet()
+        values.add("value")
+        assert "value" in values
+        assert values.path is None
+        values.close()
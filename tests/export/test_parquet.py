@@ -0,0 +1,68 @@
+import shutil
+from tempfile import mkdtemp
+from unittest import TestCase
+
+import pytest
+
+from followthemoney import model
+from followthemoney.export.parquet import ParquetExporter
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+ENTITY = {
+    "id": "person",
+    "schema": "Person",
+    "properties": {
+        "name": ["Ralph Tester"],
+        "birthDate": ["1972-05-01"],
+        "idNumber": ["9177171", "8e839023"],
+        "website": ["https://ralphtester.me"],
+        "phone": ["+12025557612"],
+        "email": ["info@ralphtester.me"],
+    },
+}
+
+
+class ParquetExportTestCase(TestCase):
+    def setUp(self):
+        self.outdir = mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def test_parquet_export(self):
+        exporter = ParquetExporter(self.outdir, extra=["source"], batch_size=2)
+        for i in range(5):
+            entity = model.get_proxy(ENTITY)
+            entity.id = "person-%d" % i
+            exporter.write(entity, extra=["test"])
+        company = model.make_entity("Company")
+        company.id = "company"
+        company.add("name", "Acme Inc.")
+        exporter.write(company)
+        exporter.finalize()
+
+        table = pq.read_table(self.outdir + "/Person.parquet")
+        assert table.num_rows == 5
+        rows = table.to_pylist()
+        assert rows[0]["id"] == "person-0"
+        assert rows[0]["source"] == "test"
+        assert rows[0]["idNumber"] == ["9177171", "8e839023"]
+        assert rows[0]["name"] == ["Ralph Tester"]
+        assert rows[0]["nationality"] is None
+        parquet_file = pq.ParquetFile(self.outdir + "/Person.parquet")
+        assert parquet_file.num_row_groups == 3
+
+        table = pq.read_table(self.outdir + "/Company.parquet")
+        rows = table.to_pylist()
+        assert len(rows) == 1
+        assert rows[0]["id"] == "company"
+        assert rows[0]["source"] is None
+        assert rows[0]["name"] == ["Acme Inc."]
+
+    def test_parquet_duplicate_columns(self):
+        entity = model.get_proxy(ENTITY)
+        for extra in (["id"], ["name"], ["source", "source"]):
+            exporter = ParquetExporter(self.outdir, extra=extra)
+            with self.assertRaises(ValueError):
+                exporter.write(entity)
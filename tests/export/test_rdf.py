@@ -1,4 +1,5 @@
 import os
+from io import StringIO
 from unittest import TestCase
 from tempfile import mkstemp
 
@@ -19,6 +20,17 @@ ENTITY = {
     },
 }
 
+# Values which need to be escaped in N-Triples literals and IRIs:
+ESCAPED_ENTITY = {
+    "id": "person-\u00e4",
+    "schema": "Person",
+    "properties": {
+        "name": ["Ральф"],
+        "notes": ['Said "hello\\world"\r\nand left.\ttab'],
+        "website": ["https://example.com/ä?q=ü#x"],
+    },
+}
+
 
 class ExcelExportTestCase(TestCase):
     def setUp(self):
@@ -36,3 +48,22 @@ class ExcelExportTestCase(TestCase):
         fh.seek(0)
         data = fh.readlines()
         assert len(data) == 8, len(data)
+
+    def test_rdf_escaping(self):
+        entity = model.get_proxy(ESCAPED_ENTITY)
+        for qualified in (True, False):
+            fast = StringIO()
+            RDFExporter(fast, qualified=qualified).write(entity)
+            slow = StringIO()
+            RDFExporter(slow, qualified=qualified, use_rdflib=True).write(entity)
+            fast_lines = fast.getvalue().splitlines()
+            assert len(fast_lines) == 4, fast_lines
+            assert sorted(fast_lines) == sorted(slow.getvalue().splitlines())
+            assert len(fast_lines) == len(set(fast_lines))
+
+        # Entities with IRIs which cannot be serialised are skipped:
+        entity.add("sourceUrl", "https://example.com/<x>")
+        for use_rdflib in (False, True):
+            fh = StringIO()
+            RDFExporter(fh, use_rdflib=use_rdflib).write(entity)
+            assert fh.getvalue() == ""
@@ -0,0 +1,78 @@
+import os
+from io import BytesIO
+from pytest import raises
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.cli.aggregate import ExternalAggregator
+from followthemoney.cli.util import write_entity
+
+
+def make_fragments():
+    fragments = []
+    for i in range(200):
+        entity_id = "entity-%s" % (i % 37)
+        schema = "LegalEntity" if i % 3 else "Company"
+        data = {
+            "id": entity_id,
+            "schema": schema,
+            "properties": {"name": ["Name %s" % i], "country": ["de"]},
+        }
+        fragments.append(model.get_proxy(data))
+    return fragments
+
+
+def aggregate_bytes(memory_limit):
+    aggregator = ExternalAggregator(EntityProxy, memory_limit=memory_limit)
+    for fragment in make_fragments():
+        aggregator.add(fragment)
+    spilled = aggregator.spill_dir is not None
+    fh = BytesIO()
+    for entity in aggregator:
+        write_entity(fh, entity)
+    assert aggregator.spill_dir is None
+    return fh.getvalue(), spilled
+
+
+def test_external_aggregate():
+    in_memory, spilled = aggregate_bytes(None)
+    assert not spilled
+    assert len(in_memory.splitlines()) == 37
+    for limit in (5000, 1):
+        output, spilled = aggregate_bytes(limit)
+        assert spilled
+        assert output == in_memory
+
+
+def test_external_aggregate_split_partitions(monkeypatch):
+    in_memory, _ = aggregate_bytes(None)
+    splits = []
+    split = ExternalAggregator._split_partition
+
+    def track_split(self, path, depth):
+        splits.append(depth)
+        return split(self, path, depth)
+
+    monkeypatch.setattr(ExternalAggregator, "_split_partition", track_split)
+    aggregator = ExternalAggregator(EntityProxy, memory_limit=3000, partitions=2)
+    for fragment in make_fragments():
+        aggregator.add(fragment)
+    fh = BytesIO()
+    for entity in aggregator:
+        write_entity(fh, entity)
+    assert fh.getvalue() == in_memory
+    assert len(splits) > 2, splits
+    assert max(splits) > 1, splits
+
+
+def test_external_aggregate_cleanup():
+    with raises(RuntimeError):
+        with ExternalAggregator(EntityProxy, memory_limit=1) as aggregator:
+            for fragment in make_fragments():
+                aggregator.add(fragment)
+            spill_dir = aggregator.spill_dir
+            assert spill_dir is not None and os.path.isdir(spill_dir)
+            # e.g. an invalid input entity, before the result is iterated:
+            raise RuntimeError("aborted")
+    assert aggregator.spill_dir is None
+    assert not os.path.exists(spill_dir)
@@ -0,0 +1,67 @@
+from followthemoney import model
+from followthemoney.blocking import BlockingIndex
+from followthemoney.compare import compare
+
+
+def make(id, schema, **props):
+    return model.get_proxy({"id": id, "schema": schema, "properties": props})
+
+
+ENTITIES = [
+    make("a", "Person", name=["Ralph Tester"], phone=["+12025557612"]),
+    make("b", "Person", name=["Ralph Tester"]),
+    make("c", "LegalEntity", name=["Ralph Cooper"], email=["info@ralph.me"]),
+    make("d", "Company", name=["Acme Ltd"], email=["info@ralph.me"]),
+    make("e", "Vessel", name=["Ralph Tester"]),
+    make("f", "Company", name=["Beta Ltd"], phone=["+12025557612"]),
+]
+
+
+def test_blocking_pairs():
+    index = BlockingIndex()
+    index.add_many(ENTITIES)
+    pairs = {(left.id, right.id) for (left, right) in index.pairs()}
+    assert ("a", "b") in pairs
+    assert ("a", "c") in pairs
+    assert ("c", "d") in pairs
+    # Vessels don't match people:
+    assert ("a", "e") not in pairs
+    # Phone number shared, but a person isn't a company:
+    assert ("a", "f") not in pairs
+    assert ("d", "f") in pairs
+    assert len(pairs) == len(list(index.pairs()))
+    for left, right in index.pairs():
+        assert compare(model, left, right) >= 0
+
+
+def test_blocking_max_block():
+    index = BlockingIndex(max_block=2)
+    index.add_many(ENTITIES)
+    pairs = {(left.id, right.id) for (left, right) in index.pairs()}
+    # "ralph" is a block of four, "tester" of three:
+    assert ("a", "b") not in pairs
+    assert ("c", "d") in pairs
+    assert ("d", "f") in pairs
+
+    index.add(make("a", "Person", idNumber=["X12345"]))
+    index.add(make("b", "Person", idNumber=["X12345"]))
+    pairs = {(left.id, right.id) for (left, right) in index.pairs()}
+    assert ("a", "b") in pairs
+
+
+def test_blocking_fragments():
+    first = make("a", "LegalEntity", name=["Ralph Tester"])
+    index = BlockingIndex()
+    index.add(first)
+    index.add(make("a", "Person", email=["ralph@tester.me"]))
+    # The fragment cannot be merged into a person, and is skipped:
+    index.add(make("a", "Vessel", name=["Ralph Vessel"]))
+    index.add(make("b", "Person", email=["ralph@tester.me"]))
+    # The entity passed in first is not modified:
+    assert first.schema.name == "LegalEntity"
+    assert first.get("email") == []
+    assert index.entities["a"].schema.name == "Person"
+    assert index.entities["a"].get("name") == ["Ralph Tester"]
+    assert index.candidates("a") == {"b"}
+    assert ("emails", "ralph@tester.me") in index.tokens["a"]
+    assert ("names", "vessel") not in index.tokens["a"]
@@ -0,0 +1,87 @@
+import orjson
+from io import BytesIO
+from pytest import raises
+from multiprocessing.pool import ThreadPool
+from click.testing import CliRunner
+
+from followthemoney import model
+from followthemoney.cli.cli import cli, _process_batches
+from followthemoney.cli.util import BinaryEntityWriter, EntityWriter
+
+
+def make_stream(writer_type):
+    fh = BytesIO()
+    writer = writer_type(fh)
+    for i in range(250):
+        proxy = model.make_entity("Person" if i % 3 else "Company")
+        proxy.id = "entity-%s" % i
+        proxy.add("name", "Entity %s" % i)
+        proxy.add("country", ["de", "fr", "gb"][i % 3])
+        if i % 5 == 0:
+            proxy.add("phone", "+49 30 %08d" % i, quiet=True)
+        writer.write(proxy)
+    writer.flush()
+    return fh.getvalue()
+
+
+def run_validate(data, *args):
+    result = CliRunner().invoke(cli, ["validate", *args], input=data)
+    assert result.exit_code == 0, result.output
+    return result.stdout_bytes
+
+
+def test_validate_workers():
+    for writer_type in (EntityWriter, BinaryEntityWriter):
+        data = make_stream(writer_type)
+        expected = run_validate(data)
+        assert len(expected.splitlines()) == 250
+        for batch_size in ("1", "7", "1000"):
+            args = ["-w", "2", "--batch-size", batch_size]
+            assert run_validate(data, *args) == expected, batch_size
+
+            output = run_validate(data, *args, "--unordered")
+            assert sorted(output.splitlines()) == sorted(expected.splitlines())
+
+
+def test_validate_workers_binary_output():
+    data = make_stream(EntityWriter)
+    expected = CliRunner().invoke(cli, ["--format", "binary", "validate"], input=data)
+    assert expected.stdout_bytes.startswith(b"FTMB")
+    args = ["--format", "binary", "validate", "-w", "2", "--batch-size", "10"]
+    result = CliRunner().invoke(cli, args, input=data)
+    assert result.exit_code == 0, result.output
+    lines = run_validate(result.stdout_bytes)
+    assert lines == run_validate(expected.stdout_bytes)
+    assert orjson.loads(lines.splitlines()[0])["id"] == "entity-0"
+
+
+def _double(batch):
+    if batch == [b"fail"]:
+        raise ValueError(batch)
+    return b"".join(batch) * 2
+
+
+def test_process_batches():
+    batches = [[b"%d" % i] for i in range(50)]
+    with ThreadPool(3) as pool:
+        for ordered in (True, False):
+            consumed = []
+
+            def read():
+                for batch in batches:
+                    consumed.append(batch)
+                    yield batch
+
+            results = []
+            for data in _process_batches(pool, _double, read(), 4, ordered=ordered):
+                results.append(data)
+                # The input is not read far ahead of the output:
+                assert len(consumed) - len(results) <= 4
+            expected = [_double(b) for b in batches]
+            if ordered:
+                assert results == expected
+            assert sorted(results) == sorted(expected)
+
+            with raises(ValueError):
+                failing = batches[:5] + [[b"fail"]] + batches[5:]
+                list(_process_batches(pool, _double, failing, 2, ordered=ordered))
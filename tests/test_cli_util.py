@@ -0,0 +1,171 @@
+import click
+import pytest
+import orjson
+from io import BytesIO
+from click.testing import CliRunner
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.compact import CompactEntityProxy
+from followthemoney.cli.cli import cli
+from followthemoney.cli.util import EntityWriter, binary_entities, path_entities
+from followthemoney.cli.util import BinaryEntityWriter, binary_lines, write_entity
+from followthemoney.cli.util import is_binary_stream, path_entity_writer
+from followthemoney.cli.util import FORMATS, path_lines
+from followthemoney.compression import detect_compression, path_compression
+from followthemoney.compression import BUFFER_SIZE, compressed_reader, open_compressed
+from followthemoney.compression import zstandard
+
+
+def make_stream():
+    fh = BytesIO()
+    for i in range(50):
+        proxy = model.make_entity("Person")
+        proxy.id = "person-%s" % i
+        proxy.add("name", ["Person %s" % i, "Name %s" % (i * 1000)])
+        proxy.add("nationality", "de")
+        write_entity(fh, proxy)
+    return fh.getvalue()
+
+
+def test_binary_entities_trusted(tmp_path):
+    data = make_stream()
+    entities = list(binary_entities(BytesIO(data), EntityProxy))
+    assert len(entities) == 50
+    trusted = list(binary_entities(BytesIO(data), EntityProxy, trusted=True))
+    assert [e.to_dict() for e in trusted] == [e.to_dict() for e in entities]
+    assert [len(e) for e in trusted] == [len(e) for e in entities]
+
+    path = tmp_path / "entities.ijson"
+    path.write_bytes(data)
+    with click.Context(cli, obj={"trusted": True}):
+        trusted = list(path_entities(path, EntityProxy))
+    assert [e.to_dict() for e in trusted] == [e.to_dict() for e in entities]
+
+
+def test_entity_writer():
+    entities = list(binary_entities(BytesIO(make_stream()), EntityProxy))
+    entities[0].context["source"] = "test"
+    entities[1] = CompactEntityProxy.from_dict(model, entities[1].to_dict())
+    expected = BytesIO()
+    for entity in entities:
+        data = entity.to_dict()
+        sort_data = {"id": data.pop("id")}
+        sort_data.update(data)
+        expected.write(orjson.dumps(sort_data, option=orjson.OPT_APPEND_NEWLINE))
+
+    fh = BytesIO()
+    writer = EntityWriter(fh)
+    for entity in entities:
+        writer.write(entity)
+    assert fh.getvalue() == expected.getvalue()
+
+    fh = BytesIO()
+    for entity in entities:
+        write_entity(fh, entity)
+    assert fh.getvalue() == expected.getvalue()
+
+
+def test_binary_stream(tmp_path):
+    entities = list(binary_entities(BytesIO(make_stream()), EntityProxy))
+    entities[0].context["source"] = "test"
+    entities[1] = CompactEntityProxy.from_dict(model, entities[1].to_dict())
+    entities[2].add("birthDate", "1980")
+    expected = [e.to_dict() for e in entities]
+
+    fh = BytesIO()
+    writer = BinaryEntityWriter(fh)
+    for entity in entities:
+        writer.write(entity)
+    writer.flush()
+    data = fh.getvalue()
+    assert is_binary_stream(BytesIO(data))
+    assert not is_binary_stream(BytesIO(make_stream()))
+    assert len(data) < len(make_stream())
+    for trusted in (True, False):
+        stream = binary_entities(BytesIO(data), EntityProxy, trusted=trusted)
+        assert [e.to_dict() for e in stream] == expected
+    compact = binary_entities(BytesIO(data), CompactEntityProxy)
+    assert [e.to_dict() for e in compact] == expected
+
+    # Binary streams can be concatenated, and are converted to JSON lines:
+    lines = list(binary_lines(BytesIO(data + data)))
+    assert len(lines) == len(entities) * 2
+    assert [orjson.loads(line) for line in lines[: len(entities)]] == expected
+    assert lines[0].startswith(b'{"id":'), lines[0]
+
+    path = tmp_path / "entities.ftmb"
+    with click.Context(cli, obj={"format": "binary"}):
+        with path_entity_writer(path) as writer:
+            writer.write(entities[0])
+            writer.write_bytes(data)
+            writer.write(entities[1])
+    assert path.read_bytes().startswith(b"FTMB")
+    read = [e.to_dict() for e in path_entities(path, EntityProxy)]
+    assert read == [expected[0]] + expected + [expected[1]]
+
+
+def test_binary_stream_frames(monkeypatch):
+    monkeypatch.setattr("followthemoney.cli.util.FRAME_ENTITIES", 7)
+    monkeypatch.setattr("followthemoney.cli.util.MAX_SHAPES", 2)
+    entities = list(binary_entities(BytesIO(make_stream()), EntityProxy))
+    for i, entity in enumerate(entities):
+        if i % 3 == 0:
+            entity.add("birthDate", "1980")
+        if i % 5 == 0:
+            entity.add("topics", "role.pep")
+    fh = BytesIO()
+    writer = BinaryEntityWriter(fh)
+    for entity in entities:
+        writer.write(entity)
+    writer.flush()
+    assert fh.getvalue().count(b"FTMB") > 1
+    stream = binary_entities(BytesIO(fh.getvalue()), EntityProxy)
+    assert [e.to_dict() for e in stream] == [e.to_dict() for e in entities]
+
+
+def test_compressed_streams(tmp_path):
+    data = make_stream()
+    expected = [e.to_dict() for e in binary_entities(BytesIO(data), EntityProxy)]
+    suffixes = [".gz", ".bz2", ".xz"]
+    if zstandard is not None:
+        suffixes.append(".zst")
+    for suffix in suffixes:
+        for format in FORMATS:
+            path = tmp_path / ("entities.%s%s" % (format, suffix))
+            with path_entity_writer(path, format=format) as writer:
+                for entity in binary_entities(BytesIO(data), EntityProxy):
+                    writer.write(entity)
+            compressed = path.read_bytes()
+            assert detect_compression(compressed) == path_compression(path)
+            read = [e.to_dict() for e in path_entities(path, EntityProxy)]
+            assert read == expected, (suffix, format)
+            lines = list(path_lines(path))
+            assert [orjson.loads(line) for line in lines] == expected
+
+            # Compression of stdin is detected from the data:
+            runner = CliRunner()
+            result = runner.invoke(cli, ["validate"], input=compressed)
+            assert result.exit_code == 0, result.output
+            read = [orjson.loads(line) for line in result.stdout_bytes.splitlines()]
+            assert read == expected, (suffix, format)
+
+
+def test_zstd_stream(tmp_path):
+    pytest.importorskip("zstandard")
+    # Write more than the buffer size, so that the compressor sees partial
+    # writes from the buffered writer:
+    data = b"".join(b'{"id": "entity-%d"}\n' % i for i in range(500000))
+    assert len(data) > BUFFER_SIZE
+    path = tmp_path / "data.zst"
+    with open_compressed(path, "wb") as fh:
+        fh.write(data[:1000])
+        fh.write(data[1000:])
+    compressed = path.read_bytes()
+    assert detect_compression(compressed) == "zstd"
+    assert len(compressed) < len(data)
+    with open_compressed(path, "rb") as fh:
+        assert fh.read() == data
+    with compressed_reader(BytesIO(compressed), "zstd") as fh:
+        assert fh.readline() == b'{"id": "entity-0"}\n'
+        assert fh.read() == data[19:]
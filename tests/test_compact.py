@@ -0,0 +1,135 @@
+import pickle
+from pytest import raises
+from unittest import TestCase
+from unittest.mock import patch
+from followthemoney.exc import InvalidData
+
+from followthemoney import model, compact
+from followthemoney.proxy import EntityProxy
+from followthemoney.compact import CompactEntityProxy
+
+ENTITY = {
+    "id": "test",
+    "schema": "Person",
+    "properties": {
+        "name": ["Ralph Tester"],
+        "birthDate": ["1972-05-01"],
+        "idNumber": ["9177171", "8e839023"],
+        "website": ["https://ralphtester.me"],
+        "phone": ["+12025557612"],
+        "email": ["info@ralphtester.me"],
+        "topics": ["role.spy"],
+    },
+}
+
+
+class CompactProxyTestCase(TestCase):
+    def test_model_factories(self):
+        proxy = model.get_proxy(ENTITY, compact=True)
+        assert isinstance(proxy, CompactEntityProxy)
+        assert not isinstance(model.get_proxy(ENTITY), CompactEntityProxy)
+        proxy = model.make_entity("Person", compact=True)
+        assert isinstance(proxy, CompactEntityProxy)
+        proxy = model.get_proxy(ENTITY, cleaned=False, compact=True)
+        assert proxy.get("phone") == ["+12025557612"]
+
+    def test_same_as_regular(self):
+        regular = EntityProxy.from_dict(model, ENTITY)
+        compact = CompactEntityProxy.from_dict(model, ENTITY)
+        assert compact.to_dict() == regular.to_dict()
+        assert list(compact.itervalues()) == list(regular.itervalues())
+        assert compact.iterprops() == regular.iterprops()
+        assert len(compact) == len(regular)
+        assert compact.caption == regular.caption
+        assert compact.get_type_inverted() == regular.get_type_inverted()
+        assert list(compact.triples()) == list(regular.triples())
+
+    def test_add_and_remove(self):
+        proxy = CompactEntityProxy.from_dict(model, ENTITY)
+        proxy.add("name", "Ralph the Great")
+        proxy.add("name", "Ralph the Great")
+        assert proxy.get("name") == ["Ralph Tester", "Ralph the Great"]
+        assert proxy.properties["name"] == ["Ralph Tester", "Ralph the Great"]
+        proxy.add("nationality", "vg")
+        assert proxy.countries == ["vg"]
+        assert proxy.has("nationality")
+
+        proxy.remove("idNumber", "9177171")
+        assert proxy.get("idNumber") == ["8e839023"]
+        proxy.remove("idNumber", "banana")
+        assert proxy.pop("idNumber") == ["8e839023"]
+        assert not proxy.has("idNumber")
+        assert proxy.pop("idNumber") == []
+
+        proxy.set("name", "Ralph")
+        assert proxy.get("name") == ["Ralph"]
+        assert proxy.get("birthPlace") == []
+
+        with raises(InvalidData):
+            proxy.get("banana")
+        with raises(InvalidData):
+            proxy.add("banana", "yellow")
+        proxy.add("banana", "yellow", quiet=True)
+
+    def test_merge(self):
+        proxy = CompactEntityProxy.from_dict(model, ENTITY)
+        other = {"schema": "LegalEntity", "properties": {"country": ["gb"]}}
+        proxy.merge(EntityProxy.from_dict(model, other))
+        proxy.merge(CompactEntityProxy.from_dict(model, ENTITY))
+        assert "gb" in proxy.countries, proxy.countries
+        assert proxy.get("idNumber") == ["9177171", "8e839023"]
+        with raises(InvalidData):
+            proxy.merge(CompactEntityProxy.from_dict(model, {"schema": "Vessel"}))
+
+    def test_merge_into_regular(self):
+        regular = EntityProxy.from_dict(model, ENTITY)
+        other = {"schema": "LegalEntity", "properties": {"country": ["gb"]}}
+        compact = CompactEntityProxy.from_dict(model, other)
+        compact.add("idNumber", "1234")
+        regular.merge(compact)
+        assert regular.schema.name == "Person"
+        assert "gb" in regular.countries, regular.countries
+        assert regular.get("idNumber") == ["9177171", "8e839023", "1234"]
+
+    def test_many_values(self):
+        proxy = CompactEntityProxy.from_dict(model, ENTITY)
+        regular = EntityProxy.from_dict(model, ENTITY)
+        for i in range(5000):
+            for entity in (proxy, regular):
+                entity.add("idNumber", "id-%s" % (i % 4000))
+                entity.add("alias", "Ralph %s" % i)
+        assert proxy.to_dict() == regular.to_dict()
+        assert list(proxy.itervalues()) == list(regular.itervalues())
+        assert len(proxy.get("idNumber")) == 4002
+
+    def test_clone_and_pickle(self):
+        proxy = CompactEntityProxy.from_dict(model, ENTITY)
+        other = proxy.clone()
+        assert isinstance(other, CompactEntityProxy)
+        other.add("name", "Banana")
+        assert "Banana" not in proxy.names
+
+        proxy2 = pickle.loads(pickle.dumps(proxy))
+        assert proxy2.to_dict() == proxy.to_dict()
+
+    def test_pickle_interning_order(self):
+        proxy = CompactEntityProxy.from_dict(model, ENTITY)
+        proxy.add("nationality", "de")
+        data = pickle.dumps(proxy)
+        expected = proxy.to_dict()
+        # Another process may have interned the property names differently:
+        names = list(reversed(compact._NAMES))
+        indexes = {name: index for index, name in enumerate(names)}
+        with patch.object(compact, "_NAMES", names):
+            with patch.object(compact, "_INDEXES", indexes):
+                other = pickle.loads(data)
+                assert other.to_dict() == expected
+                assert other.get("email") == ["info@ralphtester.me"]
+                other.add("alias", "Ralph")
+                assert other.get("alias") == ["Ralph"]
+
+    def test_merge_packed(self):
+        proxy = CompactEntityProxy.from_dict(model, ENTITY)
+        other = {"schema": "LegalEntity", "properties": {"country": ["gb"]}}
+        proxy.merge(CompactEntityProxy.from_dict(model, other))
+        assert proxy._pending is None
@@ -2,7 +2,8 @@ from copy import deepcopy
 from unittest import TestCase
 
 from followthemoney import model
-from followthemoney.compare import compare, compare_names
+from followthemoney.compare import compare, compare_names, compare_many
+from followthemoney.compare import ComparisonFeatures
 
 ENTITY = {
     "id": "test",
@@ -71,3 +72,19 @@ class CompareTestCase(TestCase):
         reduced["properties"]["name"] = ["Frank Banana"]
         reduced_proxy = model.get_proxy(reduced)
         self.assertLess(compare(model, entity, reduced_proxy), best_score)
+
+    def test_compare_many(self):
+        entity = model.get_proxy(ENTITY)
+        other = deepcopy(ENTITY)
+        other["properties"]["name"] = ["Ralph Banana"]
+        other = model.get_proxy(other)
+        vessel = model.get_proxy({"schema": "Vessel", "properties": {"name": ["X"]}})
+        vessel_features = ComparisonFeatures(vessel)
+        candidates = [entity, other, vessel_features]
+        scores = compare_many(model, entity, candidates)
+        assert scores == [compare(model, entity, c) for c in candidates]
+        assert scores[0] > scores[1] > scores[2]
+        assert scores[2] == 0.0
+        # Features are not computed for entities which cannot match:
+        assert vessel_features._inverted is None
+        assert vessel_features._names is None
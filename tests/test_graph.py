@@ -87,6 +87,22 @@ def test_adjacent():
     assert adj[0].id in repr(adj[0]), repr(adj[0])
 
 
+def test_adjacency_index():
+    graph = Graph(edge_types=registry.pivots)
+    for data in (ENTITY, ENTITY2, REL, PASS, REL):
+        graph.add(model.get_proxy(data, cleaned=False))
+    for node in graph.iternodes():
+        outbound = [e for e in graph.iteredges() if e.source == node]
+        assert list(graph.get_outbound(node)) == outbound
+        inbound = [e for e in graph.iteredges() if e.target == node]
+        assert list(graph.get_inbound(node)) == inbound
+
+    node = Node(registry.entity, "ralph")
+    assert len(list(graph.get_adjacent(node))) == 7
+    graph.flush()
+    assert len(list(graph.get_adjacent(node))) == 0
+
+
 def test_to_dict():
     proxy = model.get_proxy(ENTITY, cleaned=False)
     graph = Graph(edge_types=registry.pivots)
@@ -0,0 +1,82 @@
+import orjson
+import pytest
+
+from followthemoney import model
+from followthemoney.exc import InvalidData
+from followthemoney.proxy import EntityProxy
+from followthemoney.cli.index import IndexedEntityFile, build_index, index_path
+from followthemoney.cli.util import BinaryEntityWriter
+
+
+def make_file(path):
+    lines = []
+    for i in range(300):
+        data = {
+            "id": "entity-%s" % ((i * 7) % 41),
+            "schema": "Person" if i % 2 else "LegalEntity",
+            "properties": {"name": ["Name %s" % i]},
+        }
+        lines.append(orjson.dumps(data) + b"\n")
+    lines.insert(10, b"\n")
+    lines.append(orjson.dumps({"id": "bäckerei", "schema": "Company"}) + b"\n")
+    path.write_bytes(b"".join(lines))
+
+
+def test_index(tmp_path):
+    path = tmp_path / "entities.ijson"
+    make_file(path)
+    # Sort the entries using run files:
+    outpath = build_index(path, memory_limit=1000)
+    assert outpath == index_path(path)
+
+    with IndexedEntityFile(path, EntityProxy) as entities:
+        assert len(entities) == 301
+        assert "entity-3" in entities
+        assert "bäckerei" in entities
+        assert "entity-99" not in entities
+        assert "entity-" not in entities
+        assert None not in entities
+        assert entities.get("entity-99") is None
+
+        entity = entities.get("entity-3")
+        assert entity is not None
+        assert entity.schema.name == "Person"
+        fragments = [o for o in entities.offsets("entity-3")]
+        assert len(fragments) > 1
+        assert fragments == sorted(fragments)
+        names = set()
+        for i in range(300):
+            if (i * 7) % 41 == 3:
+                names.add("Name %s" % i)
+        assert set(entity.get("name")) == names
+
+        entity = entities.get("bäckerei")
+        assert entity is not None
+        assert entity.schema.name == "Company"
+
+    path.write_bytes(path.read_bytes() + b"\n")
+    with pytest.raises(InvalidData):
+        IndexedEntityFile(path, EntityProxy)
+
+
+def test_index_invalid(tmp_path):
+    path = tmp_path / "entities.ftmb"
+    with open(path, "wb") as fh:
+        writer = BinaryEntityWriter(fh)
+        entity = model.make_entity("Person")
+        entity.id = "person"
+        writer.write(entity)
+        writer.flush()
+    with pytest.raises(InvalidData):
+        build_index(path)
+
+    path = tmp_path / "entities.ijson"
+    path.write_bytes(b"")
+    build_index(path)
+    with IndexedEntityFile(path, EntityProxy) as entities:
+        assert len(entities) == 0
+        assert entities.get("banana") is None
+
+    (tmp_path / "entities.ijson.idx").write_bytes(b"")
+    with pytest.raises(InvalidData):
+        IndexedEntityFile(path, EntityProxy)
@@ -1,11 +1,50 @@
 import os
 import yaml
+import sqlite3
 import responses
+from threading import Thread
+from functools import partial
+from contextlib import closing
 from unittest import TestCase
+from tempfile import TemporaryDirectory
+from click.testing import CliRunner
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from followthemoney import model
+from followthemoney.cli.cli import cli
 from followthemoney.exc import InvalidMapping
 
 
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+# Keys of a table used to test that splitting up a query reads all rows:
+SPARSE_IDS = [-5, -3, 1, 2, 3, None, 7, 8]
+SPARSE_CODES = [1, None, 1, 2, 2, 3, None, 4]
+
+
+def make_sparse_mapping(directory):
+    db_path = os.path.join(directory, "sparse.sqlite")
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("CREATE TABLE entity (id integer, code integer, name text)")
+        keys = enumerate(zip(SPARSE_IDS, SPARSE_CODES))
+        rows = [(id_, code, "Entity %s" % i) for i, (id_, code) in keys]
+        conn.executemany("INSERT INTO entity VALUES (?, ?, ?)", rows)
+        conn.commit()
+    return {
+        "database": "sqlite:///" + db_path,
+        "table": "entity",
+        "entities": {
+            "entity": {
+                "schema": "Person",
+                "key": "name",
+                "properties": {"name": {"column": "name"}},
+            }
+        },
+    }
+
+
 class MappingTestCase(TestCase):
     def setUp(self):
         self.fixture_path = os.path.join(os.path.dirname(__file__), "fixtures")
@@ -123,6 +162,136 @@ class MappingTestCase(TestCase):
         ids = set([e.id for e in entities])
         assert len(ids) == 5607, len(ids)
 
+    def test_kek_sqlite_partition(self):
+        records = list(model.make_mapping(self.kek_mapping).source.records)
+        for method in ("modulo", "range"):
+            mapping = dict(self.kek_mapping)
+            mapping["partition"] = {"column": "comp.id", "method": method}
+            parts = []
+            for index in range(3):
+                query = model.make_mapping(mapping)
+                query.source.set_partition(index, 3)
+                part = list(query.source.records)
+                assert len(part) == len(query.source)
+                assert 0 < len(part) < len(records)
+                parts.extend(part)
+            assert len(parts) == len(records)
+            key = lambda r: sorted(r.items())  # noqa
+            assert sorted(parts, key=key) == sorted(records, key=key)
+
+        mapping = dict(self.kek_mapping)
+        with self.assertRaises(InvalidMapping):
+            model.make_mapping(mapping).source.set_partition(0, 2)
+        mapping["partition"] = {"column": "comp.id", "method": "banana"}
+        with self.assertRaises(InvalidMapping):
+            model.make_mapping(mapping)
+        mapping["partition"] = {"column": "comp.name", "method": "range"}
+        with self.assertRaises(InvalidMapping):
+            model.make_mapping(mapping)
+        mapping["partition"] = {"column": "comp.name", "method": "modulo"}
+        with self.assertRaises(InvalidMapping):
+            model.make_mapping(mapping)
+
+    def test_sqlite_partition_all_rows(self):
+        with TemporaryDirectory() as tmp_dir:
+            mapping = make_sparse_mapping(tmp_dir)
+            records = list(model.make_mapping(mapping).source.records)
+            assert len(records) == len(SPARSE_IDS)
+            key = lambda r: r["name"]  # noqa
+            for method in ("modulo", "range"):
+                mapping["partition"] = {"column": "id", "method": method}
+                for count in (1, 2, 3, 5):
+                    parts = []
+                    for index in range(count):
+                        query = model.make_mapping(mapping)
+                        query.source.set_partition(index, count)
+                        part = list(query.source.records)
+                        assert len(part) == len(query.source)
+                        parts.extend(part)
+                    assert sorted(parts, key=key) == sorted(records, key=key)
+
+    def test_kek_sqlite_partition_bounds(self):
+        mapping = dict(self.kek_mapping)
+        mapping["partition"] = {"column": "comp.id", "method": "range"}
+        query = model.make_mapping(mapping)
+        query.source.set_partition(1, 3)
+        calls = []
+        bounds = query.source._bounds
+
+        def count_bounds(*args, **kwargs):
+            calls.append(args)
+            return bounds(*args, **kwargs)
+
+        query.source._bounds = count_bounds
+        query.source.compose_query()
+        len(query.source)
+        list(query.source.records)
+        assert len(calls) == 1, calls
+
+    def test_kek_map_workers(self):
+        partitioned = dict(self.kek_mapping)
+        partitioned["partition"] = {"column": "comp.id", "count": 3}
+        config = {"kek": {"queries": [partitioned, self.kek_mapping]}}
+        with TemporaryDirectory() as tmp_dir:
+            mapping_path = os.path.join(tmp_dir, "kek.yml")
+            with open(mapping_path, "w") as fh:
+                yaml.safe_dump(config, fh)
+            outputs = []
+            for workers in ("1", "3"):
+                args = ["map", "--workers", workers, mapping_path]
+                result = CliRunner().invoke(cli, args)
+                assert result.exit_code == 0, result.output
+                outputs.append(result.stdout_bytes.splitlines())
+        single, parallel = outputs
+        assert len(single) == 8712 * 2, len(single)
+        assert sorted(parallel) == sorted(single)
+        # The unpartitioned query is written after the first one, in order:
+        assert parallel[8712:] == single[8712:]
+
+    def test_kek_sqlite_pagination(self):
+        key = lambda r: sorted(r.items())  # noqa
+        records = list(model.make_mapping(self.kek_mapping).source.records)
+        records = sorted(records, key=key)
+        for readers in (1, 3):
+            mapping = dict(self.kek_mapping)
+            mapping["page_size"] = 100
+            mapping["pagination"] = {
+                "columns": ["comp.id", "sub.id"],
+                "readers": readers,
+            }
+            query = model.make_mapping(mapping)
+            assert query.source.page_size == 100
+            paged = list(query.source.records)
+            assert sorted(paged, key=key) == records
+
+        mapping = dict(self.kek_mapping)
+        mapping["pagination"] = {"readers": 2}
+        with self.assertRaises(InvalidMapping):
+            model.make_mapping(mapping)
+        mapping["pagination"] = {"columns": ["comp.name", "comp.id"], "readers": 2}
+        with self.assertRaises(InvalidMapping):
+            model.make_mapping(mapping)
+        mapping["pagination"]["readers"] = 1
+        model.make_mapping(mapping)
+
+    def test_sqlite_pagination_all_rows(self):
+        with TemporaryDirectory() as tmp_dir:
+            mapping = make_sparse_mapping(tmp_dir)
+            records = list(model.make_mapping(mapping).source.records)
+            assert len(records) == len(SPARSE_IDS)
+            key = lambda r: r["name"]  # noqa
+            mapping["page_size"] = 2
+            for columns in (["id"], ["id", "code"], ["code", "id"]):
+                for readers in (1, 2, 3):
+                    mapping["pagination"] = {"columns": columns, "readers": readers}
+                    paged = list(model.make_mapping(mapping).source.records)
+                    assert sorted(paged, key=key) == sorted(records, key=key)
+
+            for page_size in (0, -1):
+                mapping["page_size"] = page_size
+                with self.assertRaises(InvalidMapping):
+                    model.make_mapping(mapping)
+
     def test_local_csv_load(self):
         url = "file://" + os.path.join(self.fixture_path, "experts.csv")
         mapping = {"csv_url": url}
@@ -158,6 +327,64 @@ class MappingTestCase(TestCase):
         entities = list(model.map_entities(mapping))
         assert len(entities) == 5, len(entities)
 
+    def test_local_csv_pruning(self):
+        url = "file://" + os.path.join(self.fixture_path, "experts.csv")
+        mapping = {
+            "csv_url": url,
+            "filters": {"gender": "female"},
+            "filters_not": {"nationality": "Germany"},
+            "entities": {
+                "expert": {
+                    "schema": "Person",
+                    "key": "name",
+                    "properties": {"name": {"column": "name"}},
+                }
+            },
+        }
+        for reader in ("rows", "columnar"):
+            mapping["csv_reader"] = reader
+            query = model.make_mapping(mapping)
+            assert query.source.columns == {"name"}
+            records = list(query.source.records)
+            assert len(records) == 4, records
+            for record in records:
+                assert list(record.keys()) == ["name"], record
+
+    def test_local_csv_columnar(self):
+        url = "file://" + os.path.join(self.fixture_path, "experts.csv")
+        mapping = {
+            "csv_url": url,
+            "filters_not": {"gender": "male"},
+            "entities": {
+                "expert": {
+                    "schema": "Person",
+                    "key": "name",
+                    "properties": {
+                        "name": {"column": "name"},
+                        "nationality": {"column": "nationality"},
+                        "summary": {"template": "{{group_name}}: {{uri}}"},
+                    },
+                }
+            },
+        }
+        entities = [e.to_dict() for e in model.map_entities(mapping)]
+        assert len(entities) == 4, len(entities)
+        mapping["csv_reader"] = "columnar"
+        mapping["batch_size"] = 3
+        columnar = [e.to_dict() for e in model.map_entities(mapping)]
+        assert columnar == entities
+
+        mapping["filters"] = {"nationality": ["Spain", "Italy"]}
+        columnar = [e.to_dict() for e in model.map_entities(mapping)]
+        del mapping["csv_reader"]
+        entities = [e.to_dict() for e in model.map_entities(mapping)]
+        assert 0 < len(entities) < 4, len(entities)
+        assert columnar == entities
+
+        mapping["csv_reader"] = "banana"
+        with self.assertRaises(InvalidMapping):
+            model.make_mapping(mapping)
+
     @responses.activate
     def test_http_csv_load(self):
         with open(os.path.join(self.fixture_path, "experts.csv"), "r") as fh:
@@ -183,6 +410,62 @@ class MappingTestCase(TestCase):
         entities = list(model.map_entities(mapping))
         assert len(entities) == 14, len(entities)
 
+    def test_http_csv_prefetch(self):
+        handler = partial(QuietHandler, directory=self.fixture_path)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base = "http://127.0.0.1:%d/experts.csv" % server.server_port
+            local = "file://" + os.path.join(self.fixture_path, "experts.csv")
+            urls = ["%s?part=%d" % (base, i) for i in range(5)]
+            mapping = {
+                "csv_urls": urls + [local],
+                "entities": {
+                    "expert": {
+                        "schema": "Person",
+                        "key": "name",
+                        "properties": {"name": {"column": "name"}},
+                    }
+                },
+            }
+            query = model.make_mapping(mapping)
+            records = list(query.source.records)
+            assert len(records) == 6 * 14, len(records)
+
+            mapping["prefetch"] = 2
+            query = model.make_mapping(mapping)
+            downloaded = []
+            download = query.source.download
+
+            def track_download(session, url):
+                downloaded.append(url)
+                return download(session, url)
+
+            query.source.download = track_download
+            assert list(query.source.records) == records
+            # The first file is streamed, only the following ones are fetched:
+            first = list(query.source.urls)[0]
+            assert first not in downloaded, downloaded
+            assert set(downloaded) <= set(urls), downloaded
+
+            # Closing the reader early cancels the pending downloads:
+            prefetched = query.source.records
+            assert next(prefetched) == records[0]
+            prefetched.close()
+
+            mapping["csv_urls"] = urls + [base.replace("experts", "banana")]
+            query = model.make_mapping(mapping)
+            with self.assertRaises(InvalidMapping):
+                list(query.source.records)
+
+            mapping["prefetch"] = -1
+            with self.assertRaises(InvalidMapping):
+                model.make_mapping(mapping)
+        finally:
+            server.shutdown()
+            server.server_close()
+
     def test_mapping_join(self):
         url = "file://" + os.path.join(self.fixture_path, "links.csv")
         mapping = {
@@ -230,3 +513,39 @@ class MappingTestCase(TestCase):
         self.assertCountEqual(
             entities[0].get("notes"), ["brown", "black", "blue"]
         )  # noqa
+
+    def test_mapping_plan(self):
+        mapping = {
+            "csv_url": "/dev/null",
+            "entities": {
+                "person": {
+                    "schema": "Person",
+                    "keys": ["id", "name"],
+                    "properties": {
+                        "phone": {"column": "phone"},
+                        "nationality": {"column": "country"},
+                        "summary": {"template": "{{name}} ({{id}}), {{name}}"},
+                        "name": {"column": "name", "required": True},
+                    },
+                }
+            },
+        }
+        query = model.make_mapping(mapping)
+        person = query.entities[0]
+        assert person.plan[0].prop.name == "nationality"
+        assert len(person.plan) == len(person.properties)
+        assert [p.prop.name for p in person.required] == ["name"]
+
+        record = {"id": "7", "name": "Jane Doe", "country": "Germany"}
+        record["phone"] = "030 1234567"
+        entity = query.map(record)["person"]
+        assert entity.get("summary") == ["Jane Doe (7), Jane Doe"]
+        assert entity.get("nationality") == ["de"]
+        assert entity.get("phone") == ["+49301234567"]
+        key = person.compute_key(record)
+        assert key == person.compute_key({"name": "7", "id": "Jane Doe"})
+        assert person.compute_key({"id": "7"}) == person.compute_key({"name": "7"})
+        assert person.compute_key({"id": ""}) is None
+
+        del record["name"]
+        assert query.map(record) == {}
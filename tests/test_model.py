@@ -1,5 +1,6 @@
 from pytest import raises
 from followthemoney import model
+from followthemoney.model import Model, read_snapshot, write_snapshot
 from followthemoney.types import registry
 from followthemoney.exc import InvalidData
 
@@ -213,3 +214,45 @@ def test_schema_temporal_extent():
     assert interval.temporal_end_props == [
         interval.get("endDate"),
     ]
+
+
+def test_model_snapshot(tmp_path):
+    snapshot = str(tmp_path / "model.json")
+    assert read_snapshot(model.path, snapshot) is None
+    write_snapshot(model.path, snapshot)
+    assert read_snapshot(model.path, snapshot) is not None
+    loaded = Model(model.path, snapshot=snapshot)
+    assert loaded.to_dict() == model.to_dict()
+
+    custom = tmp_path / "schema"
+    custom.mkdir()
+    (custom / "banana.yaml").write_text("Banana:\n  label: Banana\n")
+    assert read_snapshot(str(custom), snapshot) is None
+    custom_model = Model(str(custom), snapshot=snapshot)
+    assert list(custom_model.schemata.keys()) == ["Banana"]
+
+
+def test_model_lazy():
+    lazy = Model(model.path, lazy=True)
+    assert len(lazy.schemata) == 0
+    person = lazy.get("Person")
+    assert person is not None
+    assert "LegalEntity" in lazy.schemata
+    assert "Vessel" not in lazy.schemata
+    assert lazy.get("Banana") is None
+    assert person.get("name") is not None
+    # Reverse properties are loaded along with the schema:
+    assert person.get("ownershipOwner") is not None
+    assert person.properties.keys() == model["Person"].properties.keys()
+    proxy = lazy.make_entity("Person")
+    proxy.add("name", "John Doe")
+    assert proxy.caption == "John Doe"
+
+    lazy.get("Company")
+    assert lazy.get("LegalEntity").can_match(lazy.get("Company"))
+
+    owner = lazy.get_qname("LegalEntity:ownershipOwner")
+    assert owner is not None
+    assert owner.reverse == lazy.get("Ownership").get("owner")
+    assert lazy.to_dict() == model.to_dict()
+    assert list(lazy.schemata.keys()) == list(model.schemata.keys())
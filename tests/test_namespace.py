@@ -1,4 +1,7 @@
+from pytest import raises
+
 from followthemoney import model
+from followthemoney.exc import InvalidData
 from followthemoney.namespace import Namespace
 
 
@@ -46,3 +49,54 @@ def test_apply():
     out = ns.apply(proxy)
     assert out.id == ns.sign(proxy.id), out
     # assert proxy.id in out.get('sameAs'), out
+
+
+def test_apply_references():
+    entity = {
+        "id": "own",
+        "schema": "Ownership",
+        "properties": {
+            "owner": ["banana", "banana.deadbeef"],
+            "asset": ["kumkwat"],
+            "percentage": ["25"],
+        },
+        "dataset": "fruit",
+    }
+    proxy = model.get_proxy(entity)
+    ns = Namespace("fruit")
+    out = ns.apply(proxy)
+    assert out.id == ns.sign("own"), out.id
+    assert out.get("owner") == [ns.sign("banana")], out.get("owner")
+    assert out.get("asset") == [ns.sign("kumkwat")], out.get("asset")
+    assert out.get("percentage") == ["25"]
+    assert out.context["dataset"] == "fruit", out.context
+    assert ns.verify(out.first("asset"))
+
+    # The source entity is left untouched:
+    out.add("percentage", "50")
+    out.context["dataset"] = "veg"
+    assert proxy.id == "own", proxy.id
+    assert proxy.get("percentage") == ["25"]
+    assert proxy.get("owner") == ["banana", "banana.deadbeef"]
+    assert proxy.context["dataset"] == "fruit", proxy.context
+
+    shallow = ns.apply(proxy, shallow=True)
+    assert shallow.id == ns.sign("own"), shallow.id
+    assert shallow.get("asset") == ["kumkwat"]
+
+    compact = ns.apply(model.get_proxy(entity, compact=True))
+    assert compact.to_dict() == ns.apply(proxy).to_dict()
+
+    assert ns._signed.info().hits > 0, ns._signed.info()
+    assert ns.sign("banana") == Namespace("fruit").sign("banana")
+
+
+def test_apply_self_reference():
+    entity = {
+        "id": "banana",
+        "schema": "LegalEntity",
+        "properties": {"parent": ["banana.deadbeef"]},
+    }
+    proxy = model.get_proxy(entity)
+    with raises(InvalidData):
+        Namespace("fruit").apply(proxy)
@@ -83,6 +83,13 @@ class ProxyTestCase(TestCase):
         with raises(InvalidData):
             EntityProxy.from_dict(model, {})
 
+    def test_trusted(self):
+        data = EntityProxy.from_dict(model, ENTITY).to_dict()
+        proxy = EntityProxy.from_dict(model, data, trusted=True)
+        assert proxy.to_dict() == EntityProxy.from_dict(model, ENTITY).to_dict()
+        assert len(proxy) == len(EntityProxy.from_dict(model, ENTITY))
+        assert "properties" not in data, data
+
     def test_unsafe_add(self):
         schema = model.schemata["Person"]
         prop = schema.properties["phone"]
@@ -0,0 +1,74 @@
+import orjson
+from click.testing import CliRunner
+
+from followthemoney import model
+from followthemoney.proxy import EntityProxy
+from followthemoney.cli.cli import cli
+from followthemoney.cli import sort as sort_module
+from followthemoney.cli.sort import external_sort, id_key, id_schema_key
+
+
+def make_lines():
+    lines = []
+    for i in range(300):
+        data = {
+            "id": "entity-%s" % ((i * 7) % 41),
+            "schema": "Person" if i % 2 else "LegalEntity",
+            "properties": {"name": ["Name %s" % i]},
+        }
+        lines.append(orjson.dumps(data) + b"\n")
+    return lines
+
+
+def test_external_sort():
+    lines = make_lines()
+    expected = sorted(lines, key=id_key)
+    assert list(external_sort(lines)) == expected
+    assert list(external_sort(lines, memory_limit=1000)) == expected
+    assert list(external_sort(lines, memory_limit=1)) == expected
+
+
+def test_external_sort_passes(monkeypatch):
+    lines = make_lines()
+    expected = sorted(lines, key=id_key)
+    merges = []
+    write_merged = sort_module._write_merged
+
+    def track_merged(directory, runs, key):
+        merges.append(len(runs))
+        return write_merged(directory, runs, key)
+
+    monkeypatch.setattr(sort_module, "_write_merged", track_merged)
+    assert list(external_sort(lines, memory_limit=1, fan_in=3)) == expected
+    # 300 runs take five passes to merge three at a time:
+    assert max(merges) == 3
+    assert len(merges) == 100 + 34 + 12 + 4 + 2, len(merges)
+
+
+def test_external_sort_schema():
+    lines = make_lines()
+    expected = sorted(lines, key=id_schema_key)
+    sorted_lines = list(external_sort(lines, id_schema_key, memory_limit=1000))
+    assert sorted_lines == expected
+    assert list(external_sort([b"\n", b'{"id": "a"}'])) == [b'{"id": "a"}\n']
+
+
+def test_sort_binary_format():
+    lines = make_lines()
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--format", "binary", "sort"], input=b"".join(lines))
+    assert result.exit_code == 0, result.output
+    assert result.stdout_bytes.startswith(b"FTMB")
+
+    result = runner.invoke(cli, ["sorted-aggregate"], input=result.stdout_bytes)
+    assert result.exit_code == 0, result.output
+    aggregated = [orjson.loads(line) for line in result.stdout_bytes.splitlines()]
+    entities = {}
+    for line in lines:
+        proxy = EntityProxy.from_dict(model, orjson.loads(line))
+        if proxy.id in entities:
+            entities[proxy.id].merge(proxy)
+        else:
+            entities[proxy.id] = proxy
+    expected = [entities[key].to_dict() for key in sorted(entities)]
+    assert aggregated == expected
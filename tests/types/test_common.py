@@ -1,3 +1,5 @@
+import pytest
+from followthemoney import model
 from followthemoney.types import registry
 
 
@@ -23,3 +25,60 @@ def test_dict():
 def test_string_cleaning():
     t = registry.string
     assert t.clean("₸15,000,000").startswith("₸")
+
+
+@pytest.fixture
+def country_cache():
+    t = registry.country
+    size = t.cache_size
+    try:
+        yield t
+    finally:
+        t.set_cache_size(size)
+
+
+def test_clean_cache(country_cache):
+    t = country_cache
+    assert t.cache_size > 0
+    t.set_cache_size(2)
+    assert t.clean("Germany") == "de"
+    assert t.clean("Germany") == "de"
+    assert t.clean("Banana") is None
+    assert t.clean("Banana") is None
+    info = t.cache_info()
+    assert info.hits == 2, info
+    assert info.misses == 2, info
+    assert info.currsize == 2, info
+    t.clean("France")
+    assert t.cache_info().currsize == 2
+    t.set_cache_size(0)
+    assert t.clean("Germany") == "de"
+    assert t.cache_info().hits == 0
+
+
+def test_phone_cache_countries():
+    t = registry.phone
+    proxy = model.make_entity("Person")
+    proxy.add("country", "DE")
+    assert t.clean("017623423980") is None
+    assert t.clean("017623423980", proxy=proxy) == "+4917623423980"
+    assert t.clean("017623423980") is None
+    proxy.add("phone", "017623423980")
+    assert proxy.get("phone") == ["+4917623423980"]
+    other = model.make_entity("Person")
+    other.add("country", "AT")
+    assert t.clean("017623423980", proxy=other) == "+4317623423980"
+    assert t.clean("+4917623423980", proxy=other) == "+4917623423980"
+
+
+def test_proxy_uses_clean_cache(country_cache):
+    t = country_cache
+    # Reset the cache, and with it the hit and miss counts:
+    t.set_cache_size(t.cache_size)
+    proxy = model.make_entity("Person")
+    proxy.add("nationality", "Germany")
+    proxy.add("country", "Germany")
+    assert proxy.get("country") == ["de"]
+    info = t.cache_info()
+    assert info.hits == 1, info
+    assert info.misses == 1, info